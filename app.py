@@ -1,11 +1,19 @@
+import uuid
+
 import streamlit as st
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-from mplsoccer import PyPizza, FontManager
-# --- Importações para a Análise de Similaridade ---
-from sklearn.preprocessing import StandardScaler 
-from sklearn.metrics.pairwise import cosine_similarity 
-# --------------------------------------------------
+# --- Módulos do próprio projeto ---
+import ingestao
+from armazem import ArmazemCompartilhado, congelar_tabela
+from filtros import IndiceFiltros
+from instrumentacao import configurar_log, medir
+from config_estilos import posicoes_fixas, estilos_pos, kpis_por_posicao
+from esbocos import EsbocosPercentis, erro_percentil
+from motor_estilos import calcular_percentis, motor_padrao, posicoes_melhores
+from exportacao_radares import iniciar_exportacao, preparar_radares
+from radar import montar_radar, radar_png
+from rodadas import BaseIncremental
+from similaridade import IndiceSimilaridade, metricas_similaridade, preparar_base_similaridade, similares_todos, tipo_do_jogador
 
 st.set_page_config(layout="wide")
 st.title("PROScout AI")
@@ -15,34 +23,361 @@ st.title("PROScout AI")
 st.markdown("🔗 **Baixe o arquivo modelo - Todos os Jogadores do brasileirão com mais de 500 minutos (Wyscout CSV):** [Modelo de Base de Dados](https://drive.google.com/file/d/1lcoC0Tv4_ZVZSOk2_Uqx6b2vTF247PRF/view?usp=sharing)")
 # ---------------------------------------------
 
+# -------------------------------
+# Armazém Compartilhado (bases, índices e percentis)
+# -------------------------------
+# Um único armazém por processo: todas as sessões que carregam a mesma exportação (mesmo hash)
+# recebem a mesma tabela somente leitura, assim como os índices e percentis derivados dela.
+# Os itens usados há mais tempo saem quando o limite de memória (PROSCOUT_ARMAZEM_MB) é atingido.
+@st.cache_resource
+def armazem_compartilhado():
+    return ArmazemCompartilhado()
+
+armazem = armazem_compartilhado()
+
+# Base limpa pelo hash do conteúdo. Fora da memória, o Parquet em disco (ingestao) continua
+# evitando a releitura do arquivo original.
+def carregar_base_compartilhada(chave, nome, compacto, dados):
+    def construir():
+        with st.spinner("Processando a base de dados..."):
+            return congelar_tabela(ingestao.carregar_base(nome, dados, chave, compacto))
+    return armazem.obter(("base", chave, compacto), construir)
+
+# Índice de filtros (idade e minutos pré-ordenados) de cada base.
+def indice_filtros_compartilhado(chave, compacto, df):
+    return armazem.obter(("filtros", chave, compacto), lambda: IndiceFiltros(df))
+
+# Percentis das métricas por (base, filtros); não dependem da posição nem dos estilos escolhidos.
+def percentis_compartilhados(chave, compacto, idade_sel, minutos_sel, df, metricas, linhas):
+    chave_item = ("percentis", chave, compacto, tuple(idade_sel), tuple(minutos_sel), tuple(metricas))
+    return armazem.obter(chave_item, lambda: congelar_tabela(calcular_percentis(df, metricas, linhas=linhas)))
+
+# Esboços de quantis de um pool de referência (várias ligas), pelo hash do arquivo .npz.
+def esbocos_compartilhados(chave, dados):
+    return armazem.obter(("esbocos", chave), lambda: EsbocosPercentis.carregar(dados))
+
+# Percentis dos jogadores filtrados em relação ao pool dos esboços.
+def percentis_referencia(chave, compacto, idade_sel, minutos_sel, chave_esbocos, esbocos, df, metricas, linhas):
+    chave_item = ("percentis_referencia", chave, compacto, tuple(idade_sel), tuple(minutos_sel), chave_esbocos, tuple(metricas))
+    return armazem.obter(chave_item, lambda: congelar_tabela(esbocos.percentis(df, metricas, linhas=linhas)))
+
+# Índice de similaridade por (base, segmento Goleiro/Linha, filtros).
+def indice_similaridade_compartilhado(chave, compacto, tipo, idade_sel, minutos_sel, df_calculo):
+    def construir():
+        with st.spinner("Indexando o pool de busca..."):
+            return IndiceSimilaridade.construir(df_calculo, tipo)
+    return armazem.obter(("indice_similaridade", chave, compacto, tipo, tuple(idade_sel), tuple(minutos_sel)), construir)
+
+# Hash do conteúdo de um arquivo enviado, calculado uma vez por arquivo na sessão.
+def hash_arquivo(arquivo):
+    hashes_arquivos = st.session_state.setdefault("hashes_arquivos", {})
+    id_arquivo = getattr(arquivo, "file_id", None) or arquivo.name
+    if id_arquivo not in hashes_arquivos:
+        hashes_arquivos[id_arquivo] = ingestao.hash_conteudo(arquivo.getvalue())
+    return hashes_arquivos[id_arquivo]
+
+# Relatório com os vizinhos mais similares de todos os jogadores (mesma chave do índice).
+@st.cache_data(max_entries=4, show_spinner="Calculando os mais similares de todos os jogadores...")
+def relatorio_similares_cache(chave, idade_sel, minutos_sel, k, _df_calculo):
+    return similares_todos(_df_calculo, k=k)
+
+# Métricas ranqueadas na análise: as dos estilos e as dos radares de todas as posições, para que
+# os percentis do score e do radar saiam de uma única passada de ranqueamento.
+METRICAS_PERCENTIS = list(dict.fromkeys(motor_padrao.metricas + [m for kpis_pos in kpis_por_posicao.values()
+                                                                 for grupo_metrica in kpis_pos.values() for m in grupo_metrica]))
+
+# Quantidade máxima de radares na exportação em lote.
+MAX_RADARES_EXPORTACAO = 100
+
+# Acompanha a exportação de radares em segundo plano, atualizando apenas este trecho da página
+# a cada segundo; a sessão continua livre para outras interações enquanto os radares são gerados.
+# O fragmento só existe enquanto a exportação roda: ao terminar, uma única reexecução da página
+# troca a barra de progresso pelo botão de download, que fica fora do fragmento periódico.
+@st.fragment(run_every=1)
+def progresso_exportacao_radares():
+    futuro, progresso, _ = st.session_state["exportacao_radares"]
+    if futuro.done():
+        st.rerun()
+    st.progress(progresso["feitos"] / max(progresso["total"], 1), text=f"Gerando radares: {progresso['feitos']}/{progresso['total']}")
+
+def painel_exportacao_radares():
+    futuro, _, formato = st.session_state["exportacao_radares"]
+    if not futuro.done():
+        progresso_exportacao_radares()
+    elif futuro.exception() is not None:
+        st.error(f"Erro ao exportar os radares: {futuro.exception()}")
+    elif formato == "PDF":
+        st.download_button("Baixar radares (PDF)", futuro.result(), file_name="radares.pdf", mime="application/pdf")
+    else:
+        st.download_button("Baixar radares (ZIP)", futuro.result(), file_name="radares.zip", mime="application/zip")
+
+# -------------------------------
+# Resultados Guardados na Sessão
+# -------------------------------
+# Os cálculos pesados (score dos estilos, busca de similares, relatório) ficam guardados na
+# sessão pela combinação das entradas que os determinam. Os reruns causados por widgets de
+# exibição reaproveitam o resultado em vez de exigir um novo clique e um novo cálculo.
+MAX_RESULTADOS_SESSAO = 8
+
+def resultado_sessao(grupo, chave):
+    return st.session_state.get(grupo, {}).get(chave)
+
+def guardar_resultado(grupo, chave, resultado):
+    # Mantém só os resultados mais recentes de cada grupo.
+    resultados = st.session_state.setdefault(grupo, {})
+    resultados.pop(chave, None)
+    resultados[chave] = resultado
+    while len(resultados) > MAX_RESULTADOS_SESSAO:
+        resultados.pop(next(iter(resultados)))
+
+# -------------------------------
+# Paginação das Tabelas de Resultados
+# -------------------------------
+# As tabelas grandes são enviadas ao navegador uma página por vez: serializar e desenhar
+# dezenas de milhares de linhas trava a interface. Trocar de página roda só o fragmento.
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+
+def controles_paginacao(chave, total):
+    col_pagina, col_tamanho, col_info = st.columns([1, 1, 2])
+    tamanho = col_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, key=f"{chave}_tamanho")
+    paginas = max(1, -(-total // tamanho))
+    # Ao aumentar o tamanho da página, a página guardada pode deixar de existir.
+    if st.session_state.get(f"{chave}_pagina", 1) > paginas:
+        st.session_state[f"{chave}_pagina"] = paginas
+    pagina = col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{chave}_pagina")
+    inicio, fim = (pagina - 1) * tamanho, min(total, pagina * tamanho)
+    col_info.caption(f"Linhas {min(inicio + 1, total)} a {fim} de {total} (página {pagina} de {paginas})")
+    return inicio, fim
+
+# Linhas do ranking nas `posicoes` do score (já na ordem do ranking), só com as colunas exibidas.
+def tabela_ranking(df, score, posicoes, metricas):
+    tabela = df.loc[score.index[posicoes], ["Jogador", "Equipa", "Idade"] + metricas]
+    tabela.insert(3, "Score", score.to_numpy()[posicoes])
+    return tabela
+
+# Ranking completo, paginado: cada página seleciona parcialmente os primeiros `fim` do score.
+@st.fragment
+def painel_ranking(df, analise):
+    score = analise["score"]
+    inicio, fim = controles_paginacao("ranking", len(score))
+    if fim <= len(analise["top"]):
+        pagina = analise["top"].iloc[inicio:fim]
+    else:
+        pagina = tabela_ranking(df, score, posicoes_melhores(score, fim)[inicio:], analise["metricas"])
+    st.dataframe(pagina[["Jogador", "Equipa", "Idade", "Score"] + analise["metricas"]].round(1))
+
+    with st.expander("Score em todos os estilos"):
+        colunas_id = [c for c in ["Jogador", "Equipa"] if c in pagina.columns]
+        st.dataframe(pagina[colunas_id].join(analise["scores_estilos"]).round(1))
+
+# Radar de um dos melhores do ranking. Como fragmento, trocar o jogador redesenha só o radar.
+@st.fragment
+def painel_radar(df_top, posicao, estilos):
+    escolhido = st.selectbox("Jogador do radar", range(len(df_top)),
+                             format_func=lambda i: f"{i + 1}º - {df_top['Jogador'].iloc[i]}")
+    jogador = df_top.iloc[escolhido]
+    titulo_pagina = "Jogador Sugerido" if escolhido == 0 else f"{escolhido + 1}º do Ranking"
+    st.subheader(f"{titulo_pagina} - {jogador.get('Jogador', 'N/A')} ({posicao})")
+
+    # Prepara os dados do jogador (métricas e cores) para o radar.
+    metricas_ordenadas, valores, slice_colors = montar_radar(jogador, posicao)
+
+    # Cria e exibe o gráfico de radar PyPizza (fontes locais, imagem em cache).
+    if metricas_ordenadas:
+        try:
+            titulo = f"{jogador.get('Jogador', 'N/A')} - {jogador.get('Equipa', 'N/A')} ({', '.join(estilos)})"
+            with etapa("radar"):
+                imagem_radar = radar_png(metricas_ordenadas, valores, slice_colors, titulo)
+            st.image(imagem_radar, width=600)
+        except Exception as e:
+            st.error(f"Erro ao gerar o gráfico de radar: {e}")
+    else:
+        st.warning("Não há métricas disponíveis para o radar desta posição.")
+
+# Opções da exportação em lote; mudar a quantidade ou o formato não roda a página inteira.
+@st.fragment
+def painel_exportacao(ranking_radares):
+    with st.expander("🖨️ Exportar radares dos melhores jogadores"):
+        st.caption(f"Última análise: {ranking_radares['posicao']} ({', '.join(ranking_radares['estilos'])})")
+        col_qtd, col_formato = st.columns(2)
+        qtd_radares = col_qtd.number_input("Quantidade de jogadores", min_value=1, max_value=len(ranking_radares["df"]), value=min(20, len(ranking_radares["df"])))
+        formato_radares = col_formato.radio("Formato", ["PDF", "ZIP (PNG)"], horizontal=True)
+        if st.button("Exportar radares"):
+            tarefas = preparar_radares(ranking_radares["df"], ranking_radares["posicao"], ranking_radares["estilos"], qtd_radares)
+            if not tarefas:
+                st.session_state.pop("exportacao_radares", None)
+                st.warning("Nenhum dos jogadores escolhidos tem métricas de radar para esta posição; nada a exportar.")
+            else:
+                futuro, progresso = iniciar_exportacao(tarefas, "pdf" if formato_radares == "PDF" else "zip")
+                st.session_state["exportacao_radares"] = (futuro, progresso, formato_radares)
+        if "exportacao_radares" in st.session_state:
+            painel_exportacao_radares()
+
+# Relatório de similares de toda a base (`df_calculo` None quando a base não tem as colunas-chave).
+@st.fragment
+def painel_relatorio(chave_base, compacto, idade_sel, minutos_sel, df_calculo):
+    with st.expander("📋 Relatório: jogadores mais similares de toda a base"):
+        relatorio_arquivo = st.file_uploader("Carregar relatório pré-calculado (Parquet ou CSV)", type=["parquet", "csv"])
+        relatorio = None
+        if relatorio_arquivo is not None:
+            relatorio = ingestao.ler_tabela(relatorio_arquivo.name, relatorio_arquivo.getvalue())
+        elif df_calculo is not None:
+            k_lote = st.number_input("Vizinhos por jogador", min_value=1, max_value=50, value=10)
+            chave_relatorio = (chave_base, compacto, tuple(idade_sel), tuple(minutos_sel), k_lote)
+            if st.button("Gerar relatório") and resultado_sessao("relatorios_similares", chave_relatorio) is None:
+                with etapa("relatorio_similares") as medicao:
+                    guardar_resultado("relatorios_similares", chave_relatorio, medicao.tamanho(
+                        relatorio_similares_cache(chave_base, idade_sel, minutos_sel, k_lote, df_calculo)))
+            relatorio = resultado_sessao("relatorios_similares", chave_relatorio)
+
+        if relatorio is not None:
+            inicio, fim = controles_paginacao("relatorio", len(relatorio))
+            st.dataframe(relatorio.iloc[inicio:fim], column_config={"Similaridade": st.column_config.ProgressColumn(
+                "Similaridade (%)", format="%.2f %%", min_value=0, max_value=100)})
+            st.download_button("Baixar relatório (CSV)", relatorio.to_csv(index=False).encode("utf-8"),
+                               file_name="similares.csv", mime="text/csv")
+
+# Busca com várias referências ("parecidos com estes jogadores"), com restrições só nos candidatos.
+COMBINACOES_GRUPO = {
+    "Parecido com qualquer um (máximo)": "max",
+    "Parecido com todos (média)": "media",
+    "Centroide do grupo": "centroide",
+}
+
+@st.fragment
+def painel_busca_grupo(chave_base, compacto, idade_sel, minutos_sel, df_calculo):
+    with st.expander("👥 Busca por vários jogadores de referência"):
+        referencias = st.multiselect("Jogadores de referência", df_calculo["Chave_Unica"].tolist())
+        col_combinacao, col_k = st.columns([3, 1])
+        combinacao = col_combinacao.radio("Combinar as referências", list(COMBINACOES_GRUPO), horizontal=True)
+        k_grupo = col_k.number_input("Jogadores por lista", min_value=1, max_value=50, value=10)
+
+        # Restrições aplicadas apenas aos candidatos (as referências podem estar fora delas).
+        faixas = {}
+        col_idade, col_minutos = st.columns(2)
+        for col, rotulo, coluna_tela in [("Idade", "Idade dos candidatos", col_idade), ("Minutos jogados:", "Minutos dos candidatos", col_minutos)]:
+            if col in df_calculo.columns and pd.api.types.is_numeric_dtype(df_calculo[col]) and df_calculo[col].notna().any():
+                minimo, maximo = int(df_calculo[col].min()), int(df_calculo[col].max())
+                if minimo < maximo:
+                    faixas[col] = coluna_tela.slider(rotulo, minimo, maximo, (minimo, maximo))
+        posicoes_candidatos = st.multiselect("Posições dos candidatos (vazio = todas)", sorted(df_calculo["Posição"].dropna().astype(str).unique()))
+
+        tipos = {tipo_do_jogador(p) for p in df_calculo.loc[df_calculo["Chave_Unica"].isin(referencias), "Posição"]}
+        agregacao = COMBINACOES_GRUPO[combinacao]
+        chave_grupo = (chave_base, compacto, tuple(idade_sel), tuple(minutos_sel), tuple(referencias), agregacao, k_grupo,
+                       tuple(sorted(faixas.items())), tuple(posicoes_candidatos))
+
+        if st.button("Buscar similares ao grupo"):
+            if not referencias:
+                st.warning("Selecione pelo menos um jogador de referência.")
+            elif len(tipos) > 1:
+                st.warning("As referências precisam ser todas goleiros ou todas jogadores de linha.")
+            elif resultado_sessao("buscas_grupo", chave_grupo) is None:
+                tipo = tipos.pop()
+                with etapa("indice_similaridade") as medicao:
+                    indice = indice_similaridade_compartilhado(chave_base, compacto, tipo, idade_sel, minutos_sel, df_calculo)
+                    medicao["linhas"], medicao["colunas"] = len(indice), len(indice.metricas)
+                with etapa("consulta_grupo") as medicao:
+                    mascara = indice.mascara(faixas, posicoes_candidatos)
+                    por_referencia, grupo = indice.consultar_varios(referencias, k=k_grupo, mascara=mascara, agregacao=agregacao)
+                    medicao["linhas"] = int(mascara.sum())
+
+                colunas_exibidas = [c for c in ["Jogador", "Equipa", "Idade", "Posição", "Minutos jogados:"] if c in df_calculo.columns]
+                dados_jogadores = df_calculo.set_index("Chave_Unica")[colunas_exibidas]
+                guardar_resultado("buscas_grupo", chave_grupo, {
+                    "grupo": dados_jogadores.reindex(grupo.index).join(grupo).round(2),
+                    "por_referencia": {
+                        referencia: dados_jogadores.reindex(lista["Chave_Unica"]).assign(Similaridade=lista["Similaridade"].to_numpy()).round(2)
+                        for referencia, lista in por_referencia.groupby("Referência", sort=False)
+                    },
+                    "tipo": tipo, "combinacao": combinacao,
+                })
+
+        busca_grupo = resultado_sessao("buscas_grupo", chave_grupo)
+        if busca_grupo is not None:
+            configuracao = {"Similaridade": st.column_config.ProgressColumn("Similaridade (%)", format="%.2f %%", min_value=0, max_value=100)}
+            if busca_grupo["grupo"].empty:
+                st.warning("Nenhum candidato atende às restrições escolhidas.")
+            else:
+                st.subheader(f"Mais similares ao grupo - {busca_grupo['combinacao']} (Busca {busca_grupo['tipo']})")
+                st.dataframe(busca_grupo["grupo"], column_config=configuracao)
+                abas = st.tabs(list(busca_grupo["por_referencia"]))
+                for aba, tabela in zip(abas, busca_grupo["por_referencia"].values()):
+                    aba.dataframe(tabela, column_config=configuracao)
+
 # Permite ao usuário carregar a própria base de dados
 uploaded_file = st.file_uploader("📂 Carregue um arquivo CSV ou XLSX", type=["csv", "xlsx"])
 # Menu lateral para alternar entre as funcionalidades da AI
 page = st.sidebar.radio("Selecione a Ferramenta AI", ["Análise de Estilos", "Jogador Similar"]) 
+# Modo compacto: lê só as colunas usadas pelas páginas, com métricas em float32 e equipe/posição
+# como categorias. Reduz bastante a memória em exportações grandes com centenas de colunas.
+modo_compacto = st.sidebar.checkbox("Carregar apenas as colunas usadas (menos memória)", value=True)
+# Painel opcional com o tempo e a memória de cada etapa desta execução.
+mostrar_diagnostico = st.sidebar.checkbox("Mostrar diagnóstico de desempenho", value=False)
+
+# -------------------------------
+# Instrumentação das Etapas
+# -------------------------------
+# Cada etapa medida vai para o painel de diagnóstico e para o log (linhas JSON), identificada
+# pela sessão para permitir a agregação entre usuários em produção.
+configurar_log()
+medicoes = []
+id_sessao = st.session_state.setdefault("id_sessao", uuid.uuid4().hex[:12])
+
+def etapa(nome):
+    return medir(nome, medicoes, sessao=id_sessao, pagina=page)
 
 if uploaded_file is not None:
 
     # -------------------------------
     # Carregamento e Limpeza Inicial dos Dados
     # -------------------------------
-    # Identifica o tipo de arquivo (.csv ou .xlsx) e carrega para um DataFrame do pandas.
-    if uploaded_file.name.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
+    # O arquivo é identificado pelo hash do conteúdo: a leitura (.csv ou .xlsx) e a limpeza
+    # acontecem uma vez e o resultado fica em cache (memória e Parquet em disco) para os reruns.
+    dados_arquivo = uploaded_file.getvalue()
+    chave_base = hash_arquivo(uploaded_file)
 
-    # Remove colunas duplicadas que podem surgir de bases de dados mal formatadas.
-    df = df.loc[:, ~df.columns.duplicated()]
+    with etapa("carregamento") as medicao:
+        df = medicao.tamanho(carregar_base_compartilhada(chave_base, uploaded_file.name, modo_compacto, dados_arquivo))
 
-    # Trata a formatação de números com vírgula: substitui ',' por '.' e converte para float.
-    # Essencial para garantir que as métricas sejam reconhecidas como numéricas para os cálculos.
-    for col in df.columns:
-        if df[col].dtype == "object":
-            try:
-                # Tenta converter colunas numéricas que usam vírgula como decimal
-                df[col] = df[col].astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False).astype(float)
-            except:
-                pass 
+    # -------------------------------
+    # Atualizações por Rodada (opcional)
+    # -------------------------------
+    # Arquivos só com os jogadores que têm dados novos (chave: Jogador + Equipa), aplicados em
+    # ordem sobre a base da temporada. Cada versão fica no armazém pela cadeia de hashes (base +
+    # rodadas), que passa a ser a chave da base: percentis, scores e índices saem da versão
+    # atualizada pelos mesmos caches da base sem rodadas.
+    arquivos_rodada = st.file_uploader("📅 Atualizações de rodada (opcional): CSV ou XLSX só com os jogadores que têm dados novos",
+                                       type=["csv", "xlsx"], accept_multiple_files=True)
+    base_incremental = None
+    if arquivos_rodada and "Jogador" in df.columns and "Equipa" in df.columns:
+        with etapa("atualizacao_rodada") as medicao:
+            base_incremental = armazem.obter(("incremental", chave_base, modo_compacto), lambda: BaseIncremental(df))
+            for arquivo in arquivos_rodada:
+                chave_rodada = hash_arquivo(arquivo)
+                chave_versao = ingestao.hash_conteudo(f"{chave_base}+{chave_rodada}".encode())
+                base_incremental = armazem.obter(
+                    ("incremental", chave_versao, modo_compacto),
+                    lambda anterior=base_incremental, arquivo=arquivo, chave=chave_rodada: anterior.aplicar_rodada(
+                        ingestao.carregar_base(arquivo.name, arquivo.getvalue(), chave, modo_compacto)))
+                chave_base = chave_versao
+            df = medicao.tamanho(base_incremental.df)
+        st.caption(f"{len(arquivos_rodada)} rodada(s) aplicada(s). Última: {base_incremental.linhas_atualizadas} jogadores atualizados.")
+    elif arquivos_rodada:
+        st.warning("A atualização por rodada precisa das colunas 'Jogador' e 'Equipa'.")
+
+    # Planilhas Excel são convertidas uma única vez para Parquet; informa o tempo e o leitor usado.
+    conversao = df.attrs.get("conversao", {})
+    if conversao.get("formato") == "xlsx":
+        dica = " Instale o pacote `python-calamine` para uma conversão mais rápida." if conversao["motor"] == "openpyxl" else ""
+        st.caption(f"Planilha convertida em {conversao['segundos']:.1f} s (leitor {conversao['motor']}); "
+                   f"as próximas cargas deste arquivo usam a cópia em Parquet.{dica}")
+
+    # Informa quais colunas de texto foram reconhecidas e convertidas para número.
+    colunas_convertidas = df.attrs.get("colunas_convertidas", [])
+    if colunas_convertidas:
+        with st.expander(f"ℹ️ {len(colunas_convertidas)} colunas convertidas para formato numérico"):
+            st.write(", ".join(colunas_convertidas))
 
     # -------------------------------
     # Interface e Aplicação de Filtros de Idade e Minutos
@@ -55,7 +390,7 @@ if uploaded_file is not None:
 
     with col1_idade:
         # Exibe o slider de idade se a coluna estiver presente e for numérica.
-        if "Idade" in df.columns and df["Idade"].dtype in ['int64', 'float64']:
+        if "Idade" in df.columns and pd.api.types.is_numeric_dtype(df["Idade"]):
             idade_min, idade_max = int(df["Idade"].min()), int(df["Idade"].max())
             idade_sel = st.slider("Idade do jogador", idade_min, idade_max, (idade_min, idade_max))
         else:
@@ -63,126 +398,20 @@ if uploaded_file is not None:
 
     with col2_min:
         # Exibe o slider de minutos jogados se a coluna estiver presente e for numérica.
-        if "Minutos jogados:" in df.columns and df["Minutos jogados:"].dtype in ['int64', 'float64']:
+        if "Minutos jogados:" in df.columns and pd.api.types.is_numeric_dtype(df["Minutos jogados:"]):
             minplayed_min, minplayed = int(df["Minutos jogados:"].min()), int(df["Minutos jogados:"].max())
             minutesplayed_sel = st.slider("Minutos do jogador na temporada", minplayed_min, minplayed, (minplayed_min, minplayed))
         else:
             st.warning("Coluna 'Minutos jogados:' não encontrada ou não é numérica. Filtro desativado.")
     
-    # Cria uma cópia da base de dados e aplica os filtros de idade e minutos selecionados.
-    df_temp = df.copy()
-    if "Idade" in df_temp.columns:
-        df_temp = df_temp[(df_temp["Idade"] >= idade_sel[0]) & (df_temp["Idade"] <= idade_sel[1])]
-    if "Minutos jogados:" in df_temp.columns:
-        df_filtrado_min_total = df_temp[(df_temp["Minutos jogados:"] >= minutesplayed_sel[0]) & (df_temp["Minutos jogados:"] <= minutesplayed_sel[1])].copy()
-    else:
-        df_filtrado_min_total = df_temp.copy()
-    
-    # -------------------------------
-    # Dicionários de Configuração da AI (Estilos, Métricas e Pesos)
-    # -------------------------------
-    # Lista das principais posições para exibição no filtro.
-    posicoes_fixas = ["Goleiro", "Lateral", "Zagueiro", "Volante", 
-                      "Meia-Central", "Meia-Ofensivo", "Extremo", "Centroavante"]
-    
-    # Mapeamento de quais 'Estilos de Jogo' estão disponíveis para cada Posição.
-    estilos_pos = {
-        "Centroavante": ["Finalizador", "Pressionador", "Dominador Aéreo", "Movimentador", "Assistente"],
-        "Extremo": ["Driblador", "Finalizador", "Cruzador", "Acelerador", "Assistente"],
-        "Meia-Ofensivo": ["Assistente", "Construtor", "Driblador", "Finalizador", "Especialista em Bola Parada"],
-        "Meia-Central": ["Construtor", "Assistente", "Box-to-Box", "Recuperador", "Distribuidor"],
-        "Volante": ["Recuperador", "Construtor", "Defensor", "Distribuidor", "Pressionador"],
-        "Lateral": ["Construtor", "Cruzador", "Acelerador", "Desarme", "Movimentador"],
-        "Zagueiro": ["Defensor", "Dominador Aéreo", "Construtor", "Líder de Defesa", "Lançador"],
-        "Goleiro": ["Shot Stopper", "Sweeper Keeper", "Distribuidor"]
-    }
-
-    # Define as métricas (KPIs) necessárias para calcular a performance em cada 'Estilo de Jogo'.
-    metricas_por_estilo = {
-        "Shot Stopper": ["Defesas, %", "Golos sofridos/90", "Golos expectáveis defendidos por 90´"],
-        "Sweeper Keeper": ["Saídas/90", "Duelos aéreos/90", "Duelos aéreos ganhos, %"],
-        "Distribuidor": ["Passes certos, %", "Passes longos certos, %", "Passes para trás recebidos pelo guarda-redes/90"],
-        "Defensor": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Cortes/90", "Interseções/90", "Faltas/90"],
-        "Líder de Defesa": ["Ações defensivas com êxito/90", "Duelos aéreos ganhos, %"],
-        "Construtor": ["Passes/90", "Passes certos, %", "Passes progressivos/90", "Passes progressivos certos, %"],
-        "Lançador": ["Passes longos/90", "Passes longos certos, %", "Passes em profundidade/90", "Passes em profundidade certos, %"],
-        "Dominador Aéreo": ["Duelos aéreos/90", "Duelos aéreos ganhos, %", "Golos de cabeça/90"],
-        "Cruzador": ["Cruzamentos/90", "Cruzamentos certos, %", "Passes para a área de penálti/90"],
-        "Driblador": ["Dribles/90", "Dribles com sucesso, %", "Acelerações/90"],
-        "Desarme": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Interseções/90"],
-        "Recuperador": ["Interseções/90", "Duelos defensivos/90", "Duelos defensivos ganhos, %", "Faltas/90"],
-        "Box-to-Box": ["Duelos/90", "Interseções/90", "Corridas progressivas/90", "Acelerações/90"],
-        "Assistente": ["Assistências/90", "Assistências esperadas/90", "Passes chave/90", "Passes inteligentes/90", "Passes inteligentes certos, %"],
-        "Finalizador": ["Golos/90", "Remates/90", "Remates à baliza, %", "Golos esperados/90", "Toques na área/90"],
-        "Acelerador": ["Corridas progressivas/90", "Acelerações/90"],
-        "Pressionador": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Acções atacantes com sucesso/90"],
-        "Movimentador": ["Acelerações/90", "Corridas progressivas/90", "Passes recebidos/90"],
-        "Especialista em Bola Parada": ["Assistências por bola parada/90", "Passes chave por bola parada/90"],
-    }
-    
-    # Pesos definidos para cada métrica dentro de um Estilo. Usado para calcular o 'Score Ponderado'.
-    # Um peso maior (ex: 3.0) indica uma métrica mais crítica para aquele estilo.
-    pesos_por_estilo = {
-        "Construtor": {"Passes certos, %": 3.0, "Passes progressivos certos, %": 2.5, "Passes progressivos/90": 1.5, "Passes/90": 1.0,},
-        "Assistente": {"Assistências/90": 3.0, "Passes chave/90": 2.5, "Assistências esperadas/90": 2.0, "Passes inteligentes certos, %": 1.5,},
-        "Driblador": {"Dribles com sucesso, %": 2.5, "Dribles/90": 1.5, "Acelerações/90": 1.0,},
-        "Finalizador": {"Golos/90": 3.0, "Golos esperados/90": 2.5, "Remates à baliza, %": 1.5, "Remates/90": 1.0,},
-        "Defensor": {"Duelos defensivos ganhos, %": 3.0, "Interseções/90": 2.5, "Cortes/90": 2.0, "Duelos defensivos/90": 1.0, "Faltas/90": 1.0,},
-        "Líder de Defesa": {"Duelos aéreos ganhos, %": 3.0, "Ações defensivas com êxito/90": 2.0,},
-        "Lançador": {"Passes longos certos, %": 3.0, "Passes em profundidade certos, %": 2.5, "Passes longos/90": 1.5, "Passes em profundidade/90": 1.0,},
-        "Cruzador": {"Cruzamentos certos, %": 3.0, "Passes para a área de penálti/90": 2.0, "Cruzamentos/90": 1.0,},
-        "Desarme": {"Duelos defensivos ganhos, %": 3.0, "Interseções/90": 2.0, "Duelos defensivos/90": 1.5,},
-        "Recuperador": {"Duelos defensivos ganhos, %": 3.0, "Interseções/90": 2.5, "Duelos defensivos/90": 1.5, "Faltas/90": 1.0,},
-        "Box-to-Box": {"Corridas progressivas/90": 2.5, "Interseções/90": 2.0, "Duelos/90": 1.5, "Acelerações/90": 1.0,},
-        "Distribuidor": {"Passes certos, %": 3.0, "Passes curtos / médios precisos, %": 2.5, "Passes curtos / médios /90": 1.5,},
-        "Acelerador": {"Corridas progressivas/90": 2.5, "Acelerações/90": 1.5,},
-        "Pressionador": {"Duelos defensivos ganhos, %": 3.0, "Acções atacantes com sucesso/90": 2.0, "Duelos defensivos/90": 1.0,},
-        "Dominador Aéreo": {"Golos de cabeça/90": 3.0, "Duelos aéreos ganhos, %": 2.0, "Duelos aéreos/90": 1.0,},
-        "Movimentador": {"Passes recebidos/90": 2.5, "Corridas progressivas/90": 1.5, "Acelerações/90": 1.0,},
-        "Shot Stopper": {"Defesas, %": 3.0, "Golos expectáveis defendidos por 90´": 2.5, "Golos sofridos/90": 1.0,},
-        "Sweeper Keeper": {"Saídas/90": 2.0, "Duelos aéreos ganhos, %": 3.0, "Duelos aéreos/90": 1.0,},
-    }
+    # Aplica os filtros de idade e minutos sobre o índice pré-ordenado da base. O resultado é a
+    # lista de posições das linhas selecionadas (sem cópia da base); cada página copia apenas
+    # as colunas de que precisa.
+    indice_filtros = indice_filtros_compartilhado(chave_base, modo_compacto, df)
+    with etapa("filtro_idade_minutos") as medicao:
+        linhas_filtradas = indice_filtros.linhas_idade_minutos(idade_sel, minutesplayed_sel)
+        medicao["linhas"] = len(linhas_filtradas)
     
-    # KPIs agrupados para a visualização no Gráfico de Radar (Pizza Plot) e para a Similaridade.
-    kpis_por_posicao = {
-        "Goleiro": {
-            "Defendendo": ["Defesas, %", "Golos sofridos/90", "Golos sofridos esperados/90", "Golos expectáveis defendidos por 90´", "Remates sofridos/90", "Jogos sem sofrer golos"],
-            "Posse": ["Passes certos, %", "Passes longos/90", "Passes longos certos, %", "Passes para trás recebidos pelo guarda-redes/90", "Saídas/90"],
-            "Atacando": []
-        },
-        "Zagueiro": {
-            "Defendendo": ["Ações defensivas com êxito/90", "Duelos defensivos/90", "Duelos defensivos ganhos, %", "Cortes/90", "Cortes de carrinho ajust. à posse", "Remates intercetados/90", "Interseções/90", "Interceções ajust. à posse", "Duelos aéreos/90", "Duelos aéreos ganhos, %"],
-            "Posse": ["Passes/90", "Passes certos, %", "Passes para a frente/90", "Passes para a frente certos, %", "Passes laterais/90", "Passes laterais certos, %", "Passes progressivos/90", "Passes progressivos certos, %"],
-            "Atacando": ["Golos", "Golos de cabeça/90", "Assistências/90"]
-        },
-        "Lateral": {
-            "Defendendo": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Interseções/90", "Cortes/90"],
-            "Posse": ["Passes/90", "Passes certos, %", "Passes progressivos/90", "Passes progressivos certos, %", "Corridas progressivas/90"],
-            "Atacando": ["Assistências/90", "Assistências esperadas/90", "Cruzamentos/90", "Cruzamentos certos, %", "Cruzamentos do flanco esquerdo/90", "Cruzamentos precisos do flanco esquerdo, %", "Cruzamentos do flanco direito/90", "Cruzamentos precisos do flanco direito, %", "Acelerações/90"]
-        },
-        "Volante": {
-            "Defendendo": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Interseções/90", "Faltas/90"],
-            "Posse": ["Passes/90", "Passes certos, %", "Passes curtos / médios /90", "Passes curtos / médios precisos, %", "Passes para a frente/90", "Passes para a frente certos, %", "Passes progressivos/90", "Passes progressivos certos, %"],
-            "Atacando": ["Assistências/90", "Assistências esperadas/90", "Passes chave/90", "Passes inteligentes/90"]
-        },
-        "Meia-Ofensivo": {
-            "Defendendo": ["Duelos/90", "Duelos ganhos, %"],
-            "Posse": ["Passes/90", "Passes certos, %", "Passes chave/90", "Passes para terço final/90", "Passes certos para terço final, %", "Passes para a área de penálti/90", "Passes precisos para a área de penálti, %", "Passes inteligentes/90"],
-            "Atacando": ["Golos/90", "Golos esperados/90", "Assistências/90", "Assistências esperadas/90", "Dribles/90", "Dribles com sucesso, %", "Toques na área/90"]
-        },
-        "Extremo": {
-            "Defendendo": ["Duelos ofensivos/90", "Duelos ofensivos ganhos, %"],
-            "Posse": ["Passes/90", "Passes certos, %", "Passes progressivos/90", "Passes progressivos certos, %", "Corridas progressivas/90", "Acelerações/90"],
-            "Atacando": ["Golos/90", "Golos esperados/90", "Assistências/90", "Assistências esperadas/90", "Cruzamentos/90", "Cruzamentos certos, %", "Dribles/90", "Dribles com sucesso, %", "Toques na área/90"]
-        },
-        "Centroavante": {
-            "Defendendo": ["Ações defensivas com êxito/90", "Duelos aéreos/90", "Duelos aéreos ganhos, %"],
-            "Posse": ["Passes/90", "Passes certos, %", "Passes recebidos/90", "Passes longos recebidos/90"],
-            "Atacando": ["Golos/90", "Golos sem ser por penálti/90", "Golos esperados/90", "Golos de cabeça/90", "Remates/90", "Remates à baliza, %", "Toques na área/90", "Acelerações/90"]
-        }
-    }
-
-
     # =======================================================
     # PÁGINA 1: ANÁLISE DE ESTILOS (PROSCOUT AI)
     # =======================================================
@@ -196,158 +425,101 @@ if uploaded_file is not None:
         estilos_validos = estilos_pos.get(posicao_sel, [])
         estilos_escolhidos = st.multiselect("Selecione os estilos", estilos_validos)
 
+        # -------------------------------
+        # Referência Global de Percentis (opcional)
+        # -------------------------------
+        # Esboços de quantis gerados por `esbocos.py` a partir de exportações de várias ligas: os
+        # percentis (tabela, scores e radares) passam a comparar os jogadores com esse pool, sem
+        # carregar as bases das outras ligas. O erro é limitado pela capacidade dos esboços.
+        arquivo_esbocos = st.file_uploader("🌍 Referência global de percentis (opcional): esboços .npz gerados por esbocos.py", type=["npz"])
+        esbocos_ref, chave_esbocos = None, None
+        if arquivo_esbocos is not None:
+            chave_esbocos = hash_arquivo(arquivo_esbocos)
+            try:
+                esbocos_ref = esbocos_compartilhados(chave_esbocos, arquivo_esbocos.getvalue())
+            except Exception:
+                st.warning("Não foi possível ler o arquivo de esboços; os percentis seguem calculados sobre a base carregada.")
+                chave_esbocos = None
+            else:
+                fontes = ", ".join(esbocos_ref.fontes) or "sem nome"
+                st.caption(f"Percentis em relação a {esbocos_ref.n} jogadores ({fontes}), com erro de até "
+                           f"~{erro_percentil(esbocos_ref.k):.1f} ponto(s) de percentil.")
+
         # -------------------------------
         # Botão para Iniciar o Cálculo e Análise
         # -------------------------------
+        # O resultado fica guardado na sessão pela combinação de base, filtros, posição e estilos:
+        # reruns que só mudam a exibição (ou widgets de outras áreas) reaproveitam o cálculo.
+        chave_analise = (chave_base, modo_compacto, tuple(idade_sel), tuple(minutesplayed_sel), posicao_sel, tuple(estilos_escolhidos), chave_esbocos)
+
         if st.button("Gerar análise"):
 
-            if df_filtrado_min_total.empty:
+            if len(linhas_filtradas) == 0:
                 st.warning("Nenhum jogador encontrado com esses filtros.")
             elif not estilos_escolhidos:
                 st.warning("Selecione pelo menos um estilo para análise.")
-            else:
-                # Coleta todas as métricas dos estilos escolhidos.
-                metricas = []
-                for estilo in estilos_escolhidos:
-                    metricas.extend(metricas_por_estilo.get(estilo, []))
-                # Filtra as métricas para incluir apenas as que existem na base de dados.
-                metricas_existentes = list(set([m for m in metricas if m in df_filtrado_min_total.columns])) # Usa set para remover duplicatas
-                
-                df_pos = df_filtrado_min_total.copy()
+            elif resultado_sessao("analises_estilos", chave_analise) is None:
+                # Métricas dos estilos escolhidos que existem na base de dados.
+                metricas_existentes = motor_padrao.metricas_dos_estilos(estilos_escolhidos, df.columns)
 
                 if not metricas_existentes:
                     st.warning("Nenhuma métrica válida encontrada no dataset para os estilos selecionados.")
                 else:
-                    # Lista de métricas em que um valor MENOR é melhor (para inverter o ranqueamento).
-                    metricas_negativas = ["Golos sofridos/90", "Faltas/90"] 
-                    
                     # Gera os percentis (rankings de 0 a 100) para cada métrica em relação aos outros jogadores.
-                    for col in metricas_existentes:
-                        if col in metricas_negativas:
-                            # Inverte o ranqueamento (ex: menos Gols Sofridos = percentil mais alto)
-                            df_pos[col + "_pct"] = df_pos[col].rank(pct=True, ascending=False) * 100
+                    # Métricas negativas (ex: Gols Sofridos) têm o ranqueamento invertido pelo motor.
+                    # Com esboços carregados, os percentis vêm do pool de referência.
+                    with etapa("percentis") as medicao:
+                        if esbocos_ref is not None:
+                            percentis = medicao.tamanho(percentis_referencia(chave_base, modo_compacto, idade_sel, minutesplayed_sel, chave_esbocos,
+                                                                             esbocos_ref, df, METRICAS_PERCENTIS, linhas_filtradas))
                         else:
-                            # Ranqueamento normal (mais Dribles = percentil mais alto)
-                            df_pos[col + "_pct"] = df_pos[col].rank(pct=True) * 100
+                            percentis = medicao.tamanho(percentis_compartilhados(chave_base, modo_compacto, idade_sel, minutesplayed_sel, df,
+                                                                                 METRICAS_PERCENTIS, linhas_filtradas))
 
                     # ---------------------------------------------
                     # CÁLCULO DE SCORE COM PESOS (Ponderação)
                     # ---------------------------------------------
-                    
-                    # Agrega os pesos de todas as métricas dos estilos selecionados.
-                    pesos_finais = {}
-                    for estilo in estilos_escolhidos:
-                        pesos_estilo = pesos_por_estilo.get(estilo, {})
-                        
-                        if not pesos_estilo:
-                            pesos_estilo = pesos_por_estilo.get(estilo, {})
-                        
-                        # Atribui o peso à métrica (mantendo o maior peso se for de múltiplos estilos)
-                        for metrica, peso in pesos_estilo.items():
-                            if metrica in metricas_existentes:
-                                pesos_finais[metrica] = max(pesos_finais.get(metrica, 0.0), peso)
-                            
-                    df_pos["Score Ponderado"] = 0.0
-                    soma_pesos = sum(pesos_finais.values())
-                    
-                    if soma_pesos > 0:
-                        # Calcula o score: soma dos percentis ponderados pela importância (peso) da métrica.
-                        for metrica, peso in pesos_finais.items():
-                            df_pos["Score Ponderado"] += df_pos[metrica + "_pct"] * peso
-                            
-                        # Normaliza para um score final de 0 a 100.
-                        df_pos["Score"] = df_pos["Score Ponderado"] / soma_pesos
-                    else:
-                        # Fallback: média simples se não houver pesos definidos.
-                        df_pos["Score"] = df_pos[[c+"_pct" for c in metricas_existentes]].mean(axis=1)
-
-                    # Classifica os jogadores pelo score final e exibe os resultados na tabela.
-                    df_final = df_pos.sort_values(by="Score", ascending=False)
-                    
-                    st.dataframe(df_final[["Jogador", "Equipa", "Idade", "Score"] + metricas_existentes].round(1))
+                    # Cada métrica recebe o maior peso entre os estilos escolhidos; o score é a média
+                    # dos percentis ponderada pelos pesos (ou a média simples se não houver pesos).
+                    with etapa("score_ponderado"):
+                        score = motor_padrao.pontuar(percentis, estilos_escolhidos)
+
+                    # Seleciona só os melhores do ranking (seleção parcial, sem ordenar a base inteira);
+                    # as demais páginas da tabela são montadas sob demanda a partir do score.
+                    with etapa("ordenacao_ranking") as medicao:
+                        df_top = tabela_ranking(df, score, posicoes_melhores(score, MAX_RADARES_EXPORTACAO), metricas_existentes)
+                        medicao.tamanho(df_top)
+
+                    guardar_resultado("analises_estilos", chave_analise, {
+                        "score": score,
+                        "metricas": metricas_existentes,
+                        # Melhores do ranking com os percentis de todas as métricas (usados pelos radares).
+                        "top": df_top.join(percentis.add_suffix("_pct")),
+                        # Score de todos os estilos calculado de uma vez (um único produto de matrizes).
+                        "scores_estilos": motor_padrao.pontuar_todos(percentis),
+                    })
 
+        # -------------------------------
+        # Resultados da Análise (tabela, scores e radar)
+        # -------------------------------
+        analise = resultado_sessao("analises_estilos", chave_analise)
+        if analise is not None:
+            painel_ranking(df, analise)
 
-                    # -------------------------------
-                    # Geração do Gráfico de Radar (Pizza Plot) para o Melhor Jogador
-                    # -------------------------------
-                    
-                    # 1. Coleta todas as métricas necessárias para o radar de qualquer posição.
-                    todas_metricas_radar = []
-                    for kpis_pos in kpis_por_posicao.values():
-                        for grupo_metrica in kpis_pos.values():
-                            todas_metricas_radar.extend(grupo_metrica)
-                    todas_metricas_radar = list(set([m for m in todas_metricas_radar if m in df_final.columns]))
-                    
-                    # 2. Garante que os percentis para o radar estejam calculados (incluindo as não usadas no score).
-                    metricas_negativas = ["Golos sofridos/90", "Faltas/90"] 
-                    for col in todas_metricas_radar:
-                        if col + "_pct" not in df_final.columns: # Não recalcular o que já existe
-                             if col in metricas_negativas:
-                                 df_final[col + "_pct"] = df_final[col].rank(pct=True, ascending=False) * 100
-                             else:
-                                 df_final[col + "_pct"] = df_final[col].rank(pct=True) * 100
-
-                    if df_final.empty:
-                        st.warning("Não há jogadores para plotar no radar.")
-                    else:
-                        # Seleciona o jogador com o maior Score Ponderado
-                        top_player = df_final.iloc[0]
-                        st.subheader(f"Jogador Sugerido - {top_player.get('Jogador', 'N/A')} ({posicao_sel})")
-
-                        # Prepara os dados do jogador (métricas e cores) para o radar.
-                        kpis = kpis_por_posicao.get(posicao_sel, {})
-                        metricas_ordenadas = []
-                        valores = []
-                        slice_colors = []
-                        grupo_cores = {"Atacando": "#FF5733", "Defendendo": "#33FF57", "Posse": "#3375FF"}
-
-                        for grupo, metricas in kpis.items():
-                            for metrica in metricas:
-                                pct_col = metrica + "_pct"
-                                if pct_col in df_final.columns:
-                                    metricas_ordenadas.append(metrica)
-                                    valor = df_final.loc[df_final["Jogador"] == top_player["Jogador"], pct_col].values[0]
-                                    valores.append(round(float(valor), 2))
-                                    slice_colors.append(grupo_cores.get(grupo, "#999999"))
-
-                        # Cria e exibe o gráfico de radar PyPizza.
-                        if metricas_ordenadas:
-                            try:
-                                font_normal = FontManager("https://raw.githubusercontent.com/googlefonts/roboto/main/src/hinted/Roboto-Regular.ttf")
-                                font_bold = FontManager("https://raw.githubusercontent.com/google/fonts/main/apache/robotoslab/RobotoSlab[wght].ttf")
-
-                                baker = PyPizza(
-                                    params=metricas_ordenadas,
-                                    background_color="#ffffff",
-                                    straight_line_color="#cccccc",
-                                    straight_line_lw=1,
-                                    last_circle_lw=0,
-                                    other_circle_lw=0,
-                                    inner_circle_size=20
-                                )
-
-                                fig, ax = baker.make_pizza(
-                                    valores,
-                                    figsize=(6, 6),
-                                    color_blank_space="same",
-                                    slice_colors=slice_colors,
-                                    value_colors=["#000000"] * len(valores),
-                                    kwargs_slices=dict(edgecolor="#ffffff", zorder=2, linewidth=1),
-                                    kwargs_params=dict(color="#000000", fontsize=4, fontproperties=font_normal.prop, va="center"),
-                                    kwargs_values=dict(color="#000000", fontsize=8, fontproperties=font_bold.prop, zorder=3, va="center")
-                                )
-
-                                fig.text(
-                                    0.5, 0.97,
-                                    f"{top_player.get('Jogador', 'N/A')} - {top_player.get('Equipa', 'N/A')} ({', '.join(estilos_escolhidos)})",
-                                    size=12, ha="center", fontproperties=font_bold.prop, color="#000000"
-                                )
-
-                                st.pyplot(fig)
-                            except Exception as e:
-                                st.error(f"Erro ao gerar o gráfico de radar: {e}")
-                        else:
-                            st.warning("Não há métricas disponíveis para o radar desta posição.")
+            # Guarda os melhores do ranking para a exportação em lote dos radares.
+            st.session_state["ranking_radares"] = {"df": analise["top"], "posicao": posicao_sel, "estilos": list(estilos_escolhidos)}
+
+            if analise["top"].empty:
+                st.warning("Não há jogadores para plotar no radar.")
+            else:
+                painel_radar(analise["top"], posicao_sel, list(estilos_escolhidos))
+
+        # -------------------------------
+        # Exportação em Lote dos Radares (melhores jogadores da última análise)
+        # -------------------------------
+        ranking_radares = st.session_state.get("ranking_radares")
+        if ranking_radares is not None:
+            painel_exportacao(ranking_radares)
 
     # =======================================================
     # PÁGINA 2: ENCONTRAR JOGADOR SIMILAR
@@ -362,12 +534,10 @@ if uploaded_file is not None:
         
         # Verifica se as colunas essenciais para a busca estão presentes.
         if 'Jogador' in df.columns and 'Equipa' in df.columns and 'Posição' in df.columns:
-            df_calculo = df_filtrado_min_total.copy()
-            # Cria a chave única "Jogador (Equipa)" para evitar nomes repetidos no seletor.
-            df_calculo['Chave_Unica'] = df_calculo['Jogador'] + " (" + df_calculo['Equipa'] + ")"
-            
-            # Garante que cada jogador/equipe tenha uma única linha para evitar erros de índice.
-            df_calculo = df_calculo.drop_duplicates(subset=['Chave_Unica'], keep='first')
+            # Cria a chave única "Jogador (Equipa)" para evitar nomes repetidos no seletor,
+            # mantendo uma única linha por jogador/equipe para evitar erros de índice.
+            with etapa("preparacao_similaridade") as medicao:
+                df_calculo = medicao.tamanho(preparar_base_similaridade(df, linhas_filtradas))
             
             if not df_calculo.empty:
                 chave_unica_disponivel = True
@@ -391,7 +561,7 @@ if uploaded_file is not None:
                 posicao_contexto = ref_player_data_row['Posição'].iloc[0] # Posição bruta (ex: LCB)
                 
                 # A similaridade será comparada apenas entre Goleiros OU Jogadores de Linha.
-                tipo_jogador = 'Goleiro' if posicao_contexto == 'Goleiro' else 'Linha' 
+                tipo_jogador = tipo_do_jogador(posicao_contexto)
                 
                 st.info(f"O jogador de referência '{jogador_referencia}' joga como: **{posicao_contexto}** (A busca será segmentada por **{tipo_jogador}**).")
             else:
@@ -399,26 +569,18 @@ if uploaded_file is not None:
                 st.warning("Jogador de referência não encontrado no conjunto de dados filtrado. Tente ajustar os filtros.")
         
         
+        # A busca fica guardada na sessão pela combinação de base, filtros e jogador de referência.
+        chave_busca = (chave_base, modo_compacto, tuple(idade_sel), tuple(minutesplayed_sel), jogador_referencia_chave)
+
         if st.button("Buscar Jogadores Similares") and jogador_referencia is not None:
             
             if not chave_unica_disponivel or ref_player_data_row is None:
                 st.error("Não é possível executar a busca. Verifique se as colunas estão corretas e se o jogador selecionado é válido.")
-            else:
+            elif resultado_sessao("buscas_similares", chave_busca) is None:
                 # --- 1. Definir Métricas Segmentadas (Goleiro ou Linha) ---
-                if tipo_jogador == 'Goleiro':
-                    # Usa as métricas de defesa e posse de bola do goleiro.
-                    metricas_sim = kpis_por_posicao.get('Goleiro', {}).get('Defendendo', []) + \
-                                   kpis_por_posicao.get('Goleiro', {}).get('Posse', [])
-                else:
-                    # Combina métricas de TODAS as posições de linha para uma busca universal.
-                    metricas_sim = []
-                    for pos, kpis in kpis_por_posicao.items():
-                        if pos != 'Goleiro':
-                            for grupo_metrica in kpis.values():
-                                metricas_sim.extend(grupo_metrica)
-                
-                # Filtra as métricas de comparação para incluir apenas as que estão na base.
-                metricas_sim = list(set([m for m in metricas_sim if m in df.columns]))
+                # Goleiros usam as métricas de defesa e posse do goleiro; jogadores de linha combinam
+                # as métricas de TODAS as posições de linha para uma busca universal.
+                metricas_sim = metricas_similaridade(tipo_jogador, df.columns)
         
                 if not metricas_sim:
                     st.warning("Nenhuma métrica de comparação válida encontrada para o tipo de jogador. Verifique as colunas.")
@@ -429,60 +591,29 @@ if uploaded_file is not None:
                 
                 if can_proceed:
                     
-                    # --- 2. Filtrar Pool de Busca (Segmentado por Tipo) ---
-                    pool_busca = df_calculo.copy()
-                    # Remove o próprio jogador de referência do pool de busca.
-                    pool_busca = pool_busca[pool_busca['Chave_Unica'] != jogador_referencia_chave]
+                    # --- 2. Índice do Pool de Busca (Segmentado por Tipo) ---
+                    # O índice guarda os vetores já padronizados do segmento e é reaproveitado entre
+                    # buscas enquanto a base, o tipo e os filtros não mudarem.
+                    with etapa("indice_similaridade") as medicao:
+                        indice = indice_similaridade_compartilhado(chave_base, modo_compacto, tipo_jogador, idade_sel, minutesplayed_sel, df_calculo)
+                        medicao["linhas"], medicao["colunas"] = len(indice), len(indice.metricas)
                     
-                    # Filtra o pool para incluir apenas jogadores do mesmo tipo (Goleiro ou Linha).
-                    if tipo_jogador == 'Goleiro':
-                        pool_busca = pool_busca[pool_busca['Posição'] == 'Goleiro'].copy()
-                    else:
-                        pool_busca = pool_busca[pool_busca['Posição'] != 'Goleiro'].copy()
-                    
-                    if ref_player_data_row.empty:
+                    if jogador_referencia_chave not in indice:
                         st.error(f"Erro: Jogador '{jogador_referencia_chave}' não encontrado no pool de dados.")
                         can_proceed = False
                     
-                    if pool_busca.empty:
+                    elif len(indice) < 2:
                         st.warning(f"Nenhum outro jogador do tipo **{tipo_jogador}** encontrado no pool de busca para comparação.")
                         can_proceed = False
                     
                     if can_proceed:
-                        # 3. Preparar os dados para cálculo.
-                        # Normalização: Padroniza as métricas (média 0, desvio padrão 1) para que métricas com grandes valores não dominem a similaridade.
-                        df_sim = pool_busca[['Chave_Unica'] + metricas_sim].set_index('Chave_Unica').fillna(0)
-                        ref_data = ref_player_data_row[metricas_sim].fillna(0).iloc[0].to_frame().T
+                        # 3-5. Calcular Similaridade (Cosseno) e selecionar os mais similares.
+                        # A similaridade do cosseno mede o ângulo entre dois vetores de características;
+                        # o resultado já vem em porcentagem (0% a 100%) e ordenado.
+                        with etapa("consulta_similaridade") as medicao:
+                            df_results = medicao.tamanho(indice.consultar(jogador_referencia_chave, k=5))
                         
-                        scaler_sim = StandardScaler()
-                        
-                        if len(df_sim) > 1:
-                            df_sim_scaled = scaler_sim.fit_transform(df_sim)
-                            df_sim_scaled = pd.DataFrame(df_sim_scaled, columns=metricas_sim, index=df_sim.index)
-                            # Transforma os dados do jogador de referência usando o mesmo scaler.
-                            ref_vector_scaled = scaler_sim.transform(ref_data).reshape(1, -1)
-                        else:
-                            st.info("Pool de busca pequeno. O cálculo será feito sem normalização.")
-                            df_sim_scaled = df_sim
-                            ref_vector_scaled = ref_data.values.reshape(1, -1)
-                            
-                        # 4. Calcular Similaridade (Cosseno)
-                        # A similaridade do cosseno mede o ângulo entre dois vetores de características.
-                        similarity_scores = cosine_similarity(ref_vector_scaled, df_sim_scaled)
-                        
-                        # 5. Criar DataFrame de Resultados
-                        df_results = pd.DataFrame(similarity_scores.T, index=df_sim_scaled.index, columns=['Similaridade'])
-                        
-                        # Converte o valor do cosseno (0 a 1) para porcentagem (0% a 100%).
-                        df_results['Similaridade'] = df_results['Similaridade'] * 100
-                        df_results['Similaridade'] = df_results['Similaridade'].clip(0, 100) # Limita por segurança
-
-                        
-                        df_results = df_results.sort_values(by='Similaridade', ascending=False)
-                        
-                        # 6. Exibir Resultados (Tabela)
-                        top_similares_chaves = df_results.head(5).index.tolist()
-                        st.subheader(f"Top 5 Jogadores Mais Similares a: **{jogador_referencia}** (Busca {tipo_jogador})")
+                        top_similares_chaves = df_results.index.tolist()
                         
                         # Junta a similaridade com os dados originais do jogador.
                         df_display = df_calculo[df_calculo['Chave_Unica'].isin(top_similares_chaves)].set_index('Chave_Unica')
@@ -494,12 +625,55 @@ if uploaded_file is not None:
                         
                         display_cols = ['Jogador', 'Equipa', 'Idade', 'Posição', 'Similaridade', 'Minutos jogados:']
                         df_display = df_display[[col for col in display_cols if col in df_display.columns]].round(2)
-                        
-                        # Exibe a tabela com a barra de progresso para o score de similaridade.
-                        st.dataframe(df_display, 
-                                     column_config={"Similaridade": st.column_config.ProgressColumn(
-                                         "Similaridade (%)", 
-                                         format="%.2f %%", 
-                                         min_value=0, 
-                                         max_value=100
-                                     )})
+
+                        guardar_resultado("buscas_similares", chave_busca, {
+                            "tabela": df_display, "padronizado": indice.padronizado,
+                            "jogador": jogador_referencia, "tipo": tipo_jogador,
+                        })
+
+        # 6. Exibir Resultados (Tabela)
+        busca = resultado_sessao("buscas_similares", chave_busca)
+        if busca is not None:
+            if not busca["padronizado"]:
+                st.info("Pool de busca pequeno. O cálculo será feito sem normalização.")
+            st.subheader(f"Top 5 Jogadores Mais Similares a: **{busca['jogador']}** (Busca {busca['tipo']})")
+
+            # Exibe a tabela com a barra de progresso para o score de similaridade.
+            st.dataframe(busca["tabela"], 
+                         column_config={"Similaridade": st.column_config.ProgressColumn(
+                             "Similaridade (%)", 
+                             format="%.2f %%", 
+                             min_value=0, 
+                             max_value=100
+                         )})
+
+        # -------------------------------
+        # Busca por Vários Jogadores de Referência
+        # -------------------------------
+        # Várias referências (ou o centroide delas) comparadas com o pool em um único cálculo,
+        # com listas por referência e uma lista combinada do grupo.
+        if chave_unica_disponivel:
+            painel_busca_grupo(chave_base, modo_compacto, idade_sel, minutesplayed_sel, df_calculo)
+
+        # -------------------------------
+        # Relatório em Lote: Mais Similares de Todos os Jogadores
+        # -------------------------------
+        # Calcula (ou carrega, se já gerado por `similares_lote.py`) os vizinhos mais similares
+        # de cada jogador da base, com a mesma segmentação e as mesmas métricas da busca acima.
+        painel_relatorio(chave_base, modo_compacto, idade_sel, minutesplayed_sel, df_calculo if chave_unica_disponivel else None)
+
+# -------------------------------
+# Painel de Diagnóstico de Desempenho
+# -------------------------------
+if mostrar_diagnostico:
+    with st.sidebar.expander("⏱️ Diagnóstico de desempenho", expanded=True):
+        if medicoes:
+            st.dataframe(pd.DataFrame(medicoes).drop(columns=["sessao", "pagina"]), hide_index=True)
+            st.caption(f"Total medido: {sum(m['segundos'] for m in medicoes):.3f} s")
+        else:
+            st.caption("Nenhuma etapa medida nesta execução.")
+
+        # Ocupação e contadores do armazém compartilhado (todas as sessões deste processo).
+        estatisticas = armazem.estatisticas()
+        st.caption(f"Armazém compartilhado: {estatisticas['itens']} itens, {estatisticas['usado_mb']} de {estatisticas['limite_mb']} MB | "
+                   f"acertos {estatisticas['acertos']}, faltas {estatisticas['faltas']}, remoções {estatisticas['remocoes']}")
@@ -0,0 +1,151 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Armazém Compartilhado entre Sessões
+# -------------------------------
+# Um único armazém por processo guarda as bases (pela chave do hash do conteúdo) e os dados
+# derivados delas (índices de filtros, percentis, índices de similaridade). Todas as sessões
+# que carregam a mesma exportação recebem o mesmo objeto, somente leitura, em vez de uma cópia
+# cada. Quando o total estimado passa do limite de memória, os itens usados há mais tempo são
+# removidos. Os contadores de acertos, faltas e remoções aparecem no painel de diagnóstico.
+
+# Limite de memória do armazém, em MB.
+LIMITE_ARMAZEM_MB = float(os.environ.get("PROSCOUT_ARMAZEM_MB", "1024"))
+
+
+def _somente_leitura(valores):
+    valores.flags.writeable = False
+    return valores
+
+
+def congelar_tabela(df):
+    """
+    Versão somente leitura de `df` para ser compartilhada entre sessões.
+
+    Colunas numéricas, colunas de texto (object) e os códigos das categóricas viram arrays
+    NumPy somente leitura (sem cópia): escrever valores no DataFrame compartilhado (`loc`,
+    `iloc`, `at`, `iat`) levanta ValueError, e as operações que criam tabelas novas (filtros,
+    recortes, junções) continuam funcionando. Substituir uma coluna inteira (`df[col] = ...`)
+    não é bloqueado pelo pandas: quem recebe a tabela compartilhada nunca atribui colunas nela.
+    Outros tipos de extensão do pandas são mantidos como estão.
+    """
+    atributos = dict(df.attrs)
+    # Sem `attrs` no laço: o pandas copiaria os atributos a cada coluna acessada.
+    df = df.copy(deep=False)
+    df.attrs = {}
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = _somente_leitura(serie.cat.codes.to_numpy())
+            colunas[col] = pd.Categorical.from_codes(codigos, dtype=serie.dtype)
+        elif isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biufmMO":
+            colunas[col] = _somente_leitura(serie.to_numpy())
+        else:
+            colunas[col] = serie.array
+    # copy=False mantém um array por coluna, sem consolidar (e copiar) os blocos do pandas.
+    congelada = pd.DataFrame(colunas, index=df.index, copy=False)
+    congelada.attrs = atributos
+    return congelada
+
+
+def tamanho_bytes(valor):
+    """Memória estimada de um item: tabelas pelo pandas, arrays e índices pelo `nbytes`."""
+    if isinstance(valor, pd.DataFrame):
+        # Colunas de texto: tamanho médio por amostra, sem varrer os objetos da base inteira.
+        total = int(valor.memory_usage(index=True, deep=False).sum())
+        for col in valor.columns[valor.dtypes == object]:
+            amostra = valor[col].head(1000)
+            if len(amostra):
+                total += int(sum(sys.getsizeof(v) for v in amostra) / len(amostra) * len(valor))
+        return total
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(index=True, deep=True))
+    nbytes = getattr(valor, "nbytes", None)
+    return int(nbytes) if nbytes is not None else sys.getsizeof(valor)
+
+
+class ArmazemCompartilhado:
+    """Cache LRU com limite de memória, seguro para várias sessões (threads) do mesmo processo."""
+
+    def __init__(self, limite_mb=LIMITE_ARMAZEM_MB):
+        self.limite_bytes = int(limite_mb * 1024 ** 2)
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.remocoes = 0
+        self._itens = OrderedDict()  # chave -> (valor, bytes)
+        self._trava = threading.Lock()
+        # Uma trava por item em construção: sessões que pedem o mesmo item ao mesmo tempo
+        # esperam a primeira terminar em vez de construí-lo de novo.
+        self._em_construcao = {}
+
+    def __contains__(self, chave):
+        with self._trava:
+            return chave in self._itens
+
+    def _buscar(self, chave):
+        # Chamado com `_trava` adquirida.
+        if chave not in self._itens:
+            return False, None
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return True, self._itens[chave][0]
+
+    def obter(self, chave, construir):
+        """Retorna o item `chave`, construindo-o com `construir()` e guardando-o se não existir."""
+        with self._trava:
+            encontrado, valor = self._buscar(chave)
+            if encontrado:
+                return valor
+            trava_item = self._em_construcao.setdefault(chave, threading.Lock())
+
+        with trava_item:
+            with self._trava:
+                encontrado, valor = self._buscar(chave)
+                if encontrado:
+                    return valor
+                self.faltas += 1
+            try:
+                valor = construir()
+                self.guardar(chave, valor)
+            finally:
+                with self._trava:
+                    self._em_construcao.pop(chave, None)
+        return valor
+
+    def guardar(self, chave, valor):
+        """Guarda `valor`, removendo os itens usados há mais tempo até caber no limite."""
+        tamanho = tamanho_bytes(valor)
+        with self._trava:
+            if chave in self._itens:
+                self.bytes_usados -= self._itens.pop(chave)[1]
+            # Um item maior que o limite inteiro não é guardado (é usado só por quem o pediu).
+            if tamanho > self.limite_bytes:
+                return
+            while self._itens and self.bytes_usados + tamanho > self.limite_bytes:
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self.bytes_usados -= tamanho_removido
+                self.remocoes += 1
+            self._itens[chave] = (valor, tamanho)
+            self.bytes_usados += tamanho
+
+    def estatisticas(self):
+        """Contadores e ocupação atuais do armazém."""
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                "itens": len(self._itens),
+                "usado_mb": round(self.bytes_usados / 1024 ** 2, 1),
+                "limite_mb": round(self.limite_bytes / 1024 ** 2, 1),
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "remocoes": self.remocoes,
+                "taxa_acerto": round(self.acertos / consultas, 3) if consultas else None,
+            }
@@ -0,0 +1,198 @@
+import argparse
+import datetime
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingestao
+from benchmarks.gerar_dados import gerar_base
+from filtros import filtrar_idade_minutos
+from motor_estilos import calcular_percentis, motor_padrao
+from esbocos import EsbocosPercentis, erro_percentil
+from radar import montar_radar, renderizar_radar
+from rodadas import BaseIncremental
+from similaridade import IndiceSimilaridade, preparar_base_similaridade
+
+# -------------------------------
+# Benchmark por Etapa do Pipeline
+# -------------------------------
+# Mede separadamente cada etapa da aplicação sobre uma base sintética: leitura, limpeza
+# numérica, filtro de idade/minutos, percentis + score ponderado, atualização por rodada
+# (rodada sobre a base mantida x temporada reenviada), esboços de quantis (construção, mescla, consulta e erro
+# frente aos percentis exatos), busca de similares (uma e dez referências) e renderização do radar. O resultado sai em JSON, para comparar versões e detectar regressões.
+# Exemplo (a partir da raiz do repositório):
+#   python -m benchmarks.benchmark --linhas 1000 50000 --saida resultados.json
+
+
+def limpeza_legada(df):
+    # Laço de conversão original (antes do parser vetorizado), mantido como referência.
+    for col in df.columns:
+        if df[col].dtype == "object":
+            try:
+                df[col] = df[col].astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False).astype(float)
+            except:
+                pass
+    return df
+
+
+def cronometrar(funcao, repeticoes):
+    """Executa `funcao` `repeticoes` vezes e retorna (último resultado, tempos em segundos)."""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, tempos
+
+
+def medir_etapas(n_linhas, colunas_extras=40, repeticoes=3, legado=False, xlsx=False):
+    """
+    Mede cada etapa do pipeline para uma base sintética de `n_linhas` jogadores.
+
+    Com `xlsx=True`, mede também a leitura da mesma base em Excel com o openpyxl e com o
+    leitor rápido (calamine, se instalado), além da carga compacta a partir do XLSX.
+    """
+    etapas = {}
+
+    def registrar(nome, funcao):
+        resultado, tempos = cronometrar(funcao, repeticoes)
+        etapas[nome] = {
+            "segundos_mediana": statistics.median(tempos),
+            "segundos_min": min(tempos),
+            "segundos": tempos,
+        }
+        return resultado
+
+    base_texto = gerar_base(n_linhas, colunas_extras)
+    dados_csv = base_texto.to_csv(index=False).encode("utf-8")
+
+    bruta = registrar("leitura_csv", lambda: ingestao.ler_arquivo("base.csv", dados_csv))
+    df = registrar("limpeza_numerica", lambda: ingestao.limpar_base(bruta.copy()))
+    if legado:
+        registrar("limpeza_numerica_legada", lambda: limpeza_legada(bruta.copy()))
+    registrar("carga_compacta", lambda: ingestao.carregar_compacto("base.csv", dados_csv))
+
+    if xlsx:
+        planilha = io.BytesIO()
+        base_texto.to_excel(planilha, index=False)
+        dados_xlsx = planilha.getvalue()
+        registrar("leitura_xlsx_openpyxl", lambda: ingestao.ler_excel(dados_xlsx, motor="openpyxl"))
+        if ingestao.MOTOR_EXCEL != "openpyxl":
+            registrar(f"leitura_xlsx_{ingestao.MOTOR_EXCEL}", lambda: ingestao.ler_excel(dados_xlsx))
+        registrar("carga_compacta_xlsx", lambda: ingestao.carregar_compacto("base.xlsx", dados_xlsx))
+
+    faixa_idade = (18, 30)
+    faixa_minutos = (500, 99999)
+    filtrada = registrar("filtro_idade_minutos", lambda: filtrar_idade_minutos(df, faixa_idade, faixa_minutos))
+
+    def pontuar():
+        percentis = calcular_percentis(filtrada, motor_padrao.metricas)
+        return percentis, motor_padrao.pontuar_todos(percentis)
+    percentis, _ = registrar("percentis_e_scores", pontuar)
+
+    # Rodada: 2% dos jogadores com métricas levemente alteradas. "rodada_aplicacao" mede só a
+    # aplicação do arquivo da rodada à base mantida; "rodada_incremental" inclui a leitura desse
+    # arquivo e os percentis e scores da versão atualizada, e o completo reenvia a temporada
+    # inteira e refaz leitura, limpeza, percentis e scores. Percentis e scores são os mesmos
+    # nos dois fluxos: a diferença entre eles é a leitura da temporada.
+    base_incremental = BaseIncremental(df)
+    rng = np.random.default_rng(1)
+    delta = df.iloc[rng.choice(len(df), max(1, len(df) // 50), replace=False)].copy()
+    for metrica in motor_padrao.metricas:
+        delta[metrica] = delta[metrica] * rng.uniform(0.97, 1.03, len(delta))
+    dados_rodada = delta.to_csv(index=False).encode("utf-8")
+    rodada = ingestao.limpar_base(ingestao.ler_arquivo("rodada.csv", dados_rodada))
+    registrar("rodada_aplicacao", lambda: base_incremental.aplicar_rodada(rodada))
+
+    def rodada_incremental():
+        versao = base_incremental.aplicar_rodada(ingestao.limpar_base(ingestao.ler_arquivo("rodada.csv", dados_rodada)))
+        return motor_padrao.pontuar_todos(calcular_percentis(versao.df, motor_padrao.metricas))
+    registrar("rodada_incremental", rodada_incremental)
+
+    def rodada_completa():
+        temporada = ingestao.limpar_base(ingestao.ler_arquivo("base.csv", dados_csv))
+        return motor_padrao.pontuar_todos(calcular_percentis(temporada, motor_padrao.metricas))
+    registrar("rodada_recalculo_completo", rodada_completa)
+
+    # Esboços de quantis: construção em lotes a partir do CSV, mescla de duas "ligas" e consulta
+    # dos percentis; o erro máximo frente aos percentis exatos vai junto do limite documentado.
+    metricas_esbocos = motor_padrao.metricas
+    def construir_esbocos():
+        conjunto = EsbocosPercentis()
+        for lote in ingestao.ler_em_lotes("base.csv", dados_csv, metricas_esbocos):
+            conjunto.atualizar(lote, metricas_esbocos)
+        return conjunto
+    esbocos = registrar("esbocos_construcao", construir_esbocos)
+    metade = len(df) // 2
+    registrar("esbocos_mescla", lambda: EsbocosPercentis().atualizar(df.iloc[:metade], metricas_esbocos).mesclar(
+        EsbocosPercentis(semente=1).atualizar(df.iloc[metade:], metricas_esbocos)))
+    aproximados = registrar("esbocos_percentis", lambda: esbocos.percentis(df, metricas_esbocos))
+    exatos = calcular_percentis(df, metricas_esbocos)
+    erro_esbocos = {
+        "erro_max_pontos": round(float((aproximados - exatos[aproximados.columns]).abs().max().max()), 3),
+        "limite_documentado_pontos": round(erro_percentil(esbocos.k), 3),
+        "kb_por_metrica": round(esbocos.nbytes / 1024 / max(1, len(esbocos.metricas)), 1),
+    }
+
+    df_calculo = preparar_base_similaridade(filtrada)
+    indice = registrar("similaridade_indice", lambda: IndiceSimilaridade.construir(df_calculo, "Linha"))
+    referencia = indice.chaves[0]
+    registrar("similaridade_consulta", lambda: indice.consultar(referencia, k=5))
+    # Dez referências em uma única consulta, com restrição de idade nos candidatos.
+    referencias = list(indice.chaves[:10])
+    registrar("similaridade_consulta_grupo", lambda: indice.consultar_varios(
+        referencias, k=5, mascara=indice.mascara({"Idade": (18, 23)}), agregacao="media"))
+
+    linha_radar = filtrada.join(percentis.add_suffix("_pct")).iloc[0]
+    params, valores, cores = montar_radar(linha_radar, "Extremo")
+    registrar("radar_render", lambda: renderizar_radar(params, valores, cores, "Benchmark"))
+
+    return {
+        "linhas": n_linhas,
+        "colunas": len(base_texto.columns),
+        "linhas_filtradas": len(filtrada),
+        "etapas": etapas,
+        "esbocos": erro_esbocos,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapa do pipeline do PROScout AI (saída em JSON).")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000, 50000], help="Tamanhos de base a medir.")
+    parser.add_argument("--colunas-extras", type=int, default=40, help="Métricas fictícias adicionais na base sintética.")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções de cada etapa (reporta mediana e mínimo).")
+    parser.add_argument("--legado", action="store_true", help="Mede também o laço de limpeza original, para comparação.")
+    parser.add_argument("--xlsx", action="store_true", help="Mede também a leitura de XLSX (openpyxl x calamine).")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: imprime na tela).")
+    args = parser.parse_args(argv)
+
+    resultado = {
+        "meta": {
+            "data": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "repeticoes": args.repeticoes,
+            "motor_excel": ingestao.MOTOR_EXCEL,
+        },
+        "bases": [medir_etapas(n, args.colunas_extras, args.repeticoes, args.legado, args.xlsx) for n in args.linhas],
+    }
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
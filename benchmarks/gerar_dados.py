@@ -0,0 +1,94 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from config_estilos import metricas_por_estilo, kpis_por_posicao
+
+# -------------------------------
+# Gerador de Bases Sintéticas no Formato do Wyscout
+# -------------------------------
+# Gera exportações com os mesmos nomes de colunas em português usados pela aplicação e com
+# números no formato brasileiro ("1.234,56"), para medir o desempenho com 1 mil a 1 milhão
+# de linhas sem depender de dados licenciados.
+# Exemplo (a partir da raiz do repositório):
+#   python -m benchmarks.gerar_dados 50000 --saida base_50k.csv
+
+POSICOES = ["Goleiro", "Zagueiro", "Lateral", "Volante", "Meia-Central", "Meia-Ofensivo", "Extremo", "Centroavante"]
+# Proporção aproximada de cada posição em um elenco.
+PROPORCOES_POSICOES = [0.08, 0.18, 0.16, 0.12, 0.12, 0.1, 0.12, 0.12]
+
+
+def metricas_da_aplicacao():
+    """Todas as métricas citadas em `metricas_por_estilo` e `kpis_por_posicao`, sem repetição."""
+    metricas = [m for lista in metricas_por_estilo.values() for m in lista]
+    metricas += [m for kpis in kpis_por_posicao.values() for grupo in kpis.values() for m in grupo]
+    return list(dict.fromkeys(metricas))
+
+
+def formatar_brasileiro(valores, casas=2):
+    """Formata números como texto no padrão brasileiro ("1.234,56"), de forma vetorizada."""
+    valores = np.round(np.asarray(valores, dtype=np.float64), casas)
+    sinais = np.where(valores < 0, "-", "")
+    inteiros = np.floor(np.abs(valores)).astype(np.int64)
+    texto_inteiros = pd.Series(inteiros).astype(str).str.replace(r"\B(?=(\d{3})+(?!\d))", ".", regex=True)
+    texto = sinais + texto_inteiros
+    if casas > 0:
+        fracoes = np.round((np.abs(valores) - inteiros) * 10 ** casas).astype(np.int64)
+        texto = texto + "," + pd.Series(fracoes).astype(str).str.zfill(casas)
+    return pd.Series(texto)
+
+
+def gerar_base(n_linhas, colunas_extras=40, semente=0):
+    """
+    Gera uma base sintética com `n_linhas` jogadores.
+
+    As métricas da aplicação vêm como texto no formato brasileiro; `colunas_extras` acrescenta
+    métricas fictícias para que a largura se aproxime de uma exportação real (~120 colunas).
+    """
+    rng = np.random.default_rng(semente)
+    n_equipas = max(20, n_linhas // 25)
+
+    dados = {
+        "Jogador": pd.Series(np.arange(n_linhas)).map("Jogador {}".format),
+        "Equipa": pd.Series(rng.integers(0, n_equipas, n_linhas)).map("Equipa {}".format),
+        "Posição": rng.choice(POSICOES, n_linhas, p=PROPORCOES_POSICOES),
+        "Idade": rng.integers(16, 39, n_linhas),
+        # Minutos saem como inteiros simples, como na exportação do Wyscout.
+        "Minutos jogados:": rng.integers(90, 3600, n_linhas),
+    }
+    for metrica in metricas_da_aplicacao():
+        if "%" in metrica:
+            valores = rng.beta(5, 3, n_linhas) * 100
+        else:
+            valores = rng.gamma(2.0, 1.5, n_linhas)
+        dados[metrica] = formatar_brasileiro(valores)
+    for i in range(colunas_extras):
+        dados[f"Métrica extra {i + 1}/90"] = formatar_brasileiro(rng.gamma(2.0, 1.0, n_linhas))
+
+    return pd.DataFrame(dados)
+
+
+def salvar_base(df, caminho):
+    """Salva a base como CSV (padrão) ou XLSX, conforme a extensão."""
+    if caminho.endswith(".xlsx"):
+        df.to_excel(caminho, index=False)
+    else:
+        df.to_csv(caminho, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera uma exportação sintética no formato do Wyscout.")
+    parser.add_argument("linhas", type=int, help="Quantidade de jogadores (ex: 1000 a 1000000).")
+    parser.add_argument("--colunas-extras", type=int, default=40, help="Métricas fictícias adicionais (padrão: 40).")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador aleatório.")
+    parser.add_argument("--saida", default="base_sintetica.csv", help="Arquivo de saída (.csv ou .xlsx).")
+    args = parser.parse_args(argv)
+
+    df = gerar_base(args.linhas, args.colunas_extras, args.semente)
+    salvar_base(df, args.saida)
+    print(f"{len(df)} linhas x {len(df.columns)} colunas salvas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
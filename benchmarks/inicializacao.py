@@ -0,0 +1,123 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# -------------------------------
+# Benchmark de Inicialização da Aplicação
+# -------------------------------
+# Mede o custo de um início a frio (como o de um contêiner novo no autoescalonamento): o
+# tempo de importação de cada dependência e módulo do projeto, cada um em um processo novo,
+# e o tempo até a primeira renderização do app.py (AppTest do Streamlit, sem arquivo
+# carregado), além de um rerun. Também informa se bibliotecas pesadas (matplotlib, mplsoccer,
+# scikit-learn) foram carregadas sem necessidade. Com `--limite`, termina com erro quando a
+# primeira renderização passa do orçamento, para uso em CI.
+# Exemplo (a partir da raiz do repositório):
+#   python -m benchmarks.inicializacao --repeticoes 5 --limite 3 --saida inicio.json
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = [
+    "streamlit", "pandas", "numpy", "pyarrow", "matplotlib.pyplot", "mplsoccer",
+    "ingestao", "motor_estilos", "similaridade", "radar", "exportacao_radares", "armazem", "rodadas",
+]
+
+# Bibliotecas que não deveriam ser importadas só para abrir a aplicação.
+PESADAS = ["matplotlib", "mplsoccer", "sklearn", "PIL"]
+
+_CODIGO_IMPORTACAO = """
+import time
+inicio = time.perf_counter()
+import {modulo}
+print(time.perf_counter() - inicio)
+"""
+
+_CODIGO_RENDERIZACAO = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+teste = AppTest.from_file("app.py", default_timeout=120)
+teste.run()
+primeira = time.perf_counter() - inicio
+inicio = time.perf_counter()
+teste.run()
+rerun = time.perf_counter() - inicio
+print(json.dumps({{
+    "primeira_execucao": primeira,
+    "rerun": rerun,
+    "erros": [str(e.value) for e in teste.exception],
+    "pesadas_carregadas": [m for m in {pesadas!r} if m in sys.modules],
+}}))
+"""
+
+
+def _executar(codigo):
+    # Cada medição roda em um interpretador novo, sem módulos já carregados em memória.
+    inicio = time.perf_counter()
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return saida.stdout.strip().splitlines()[-1], time.perf_counter() - inicio
+
+
+def tempo_importacao(modulo):
+    """Segundos para importar `modulo` em um processo novo."""
+    saida, _ = _executar(_CODIGO_IMPORTACAO.format(modulo=modulo))
+    return float(saida)
+
+
+def primeira_renderizacao():
+    """Tempo até a primeira renderização do app em um processo novo (inclui o interpretador)."""
+    saida, segundos_processo = _executar(_CODIGO_RENDERIZACAO.format(pesadas=PESADAS))
+    resultado = json.loads(saida)
+    resultado["processo"] = segundos_processo
+    return resultado
+
+
+def _resumo(tempos):
+    return {"segundos_mediana": statistics.median(tempos), "segundos_min": min(tempos), "segundos": tempos}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do PROScout AI (saída em JSON).")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Processos novos por medição (reporta mediana e mínimo).")
+    parser.add_argument("--limite", type=float, default=None, help="Orçamento em segundos para a primeira renderização (mediana).")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: imprime na tela).")
+    args = parser.parse_args(argv)
+
+    importacoes = {modulo: _resumo([tempo_importacao(modulo) for _ in range(args.repeticoes)]) for modulo in MODULOS}
+    renderizacoes = [primeira_renderizacao() for _ in range(args.repeticoes)]
+
+    resultado = {
+        "meta": {
+            "data": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "repeticoes": args.repeticoes,
+        },
+        "importacao": importacoes,
+        "primeira_renderizacao": {
+            "processo": _resumo([r["processo"] for r in renderizacoes]),
+            "primeira_execucao": _resumo([r["primeira_execucao"] for r in renderizacoes]),
+            "rerun": _resumo([r["rerun"] for r in renderizacoes]),
+            "pesadas_carregadas": renderizacoes[-1]["pesadas_carregadas"],
+            "erros": renderizacoes[-1]["erros"],
+        },
+    }
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+    if args.limite is not None and resultado["primeira_renderizacao"]["processo"]["segundos_mediana"] > args.limite:
+        sys.exit(f"Primeira renderização acima do orçamento de {args.limite:.2f} s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -------------------------------
+# Dicionários de Configuração da AI (Estilos, Métricas e Pesos)
+# -------------------------------
+# Lista das principais posições para exibição no filtro.
+posicoes_fixas = ["Goleiro", "Lateral", "Zagueiro", "Volante", 
+                  "Meia-Central", "Meia-Ofensivo", "Extremo", "Centroavante"]
+
+# Mapeamento de quais 'Estilos de Jogo' estão disponíveis para cada Posição.
+estilos_pos = {
+    "Centroavante": ["Finalizador", "Pressionador", "Dominador Aéreo", "Movimentador", "Assistente"],
+    "Extremo": ["Driblador", "Finalizador", "Cruzador", "Acelerador", "Assistente"],
+    "Meia-Ofensivo": ["Assistente", "Construtor", "Driblador", "Finalizador", "Especialista em Bola Parada"],
+    "Meia-Central": ["Construtor", "Assistente", "Box-to-Box", "Recuperador", "Distribuidor"],
+    "Volante": ["Recuperador", "Construtor", "Defensor", "Distribuidor", "Pressionador"],
+    "Lateral": ["Construtor", "Cruzador", "Acelerador", "Desarme", "Movimentador"],
+    "Zagueiro": ["Defensor", "Dominador Aéreo", "Construtor", "Líder de Defesa", "Lançador"],
+    "Goleiro": ["Shot Stopper", "Sweeper Keeper", "Distribuidor"]
+}
+
+# Define as métricas (KPIs) necessárias para calcular a performance em cada 'Estilo de Jogo'.
+metricas_por_estilo = {
+    "Shot Stopper": ["Defesas, %", "Golos sofridos/90", "Golos expectáveis defendidos por 90´"],
+    "Sweeper Keeper": ["Saídas/90", "Duelos aéreos/90", "Duelos aéreos ganhos, %"],
+    "Distribuidor": ["Passes certos, %", "Passes longos certos, %", "Passes para trás recebidos pelo guarda-redes/90"],
+    "Defensor": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Cortes/90", "Interseções/90", "Faltas/90"],
+    "Líder de Defesa": ["Ações defensivas com êxito/90", "Duelos aéreos ganhos, %"],
+    "Construtor": ["Passes/90", "Passes certos, %", "Passes progressivos/90", "Passes progressivos certos, %"],
+    "Lançador": ["Passes longos/90", "Passes longos certos, %", "Passes em profundidade/90", "Passes em profundidade certos, %"],
+    "Dominador Aéreo": ["Duelos aéreos/90", "Duelos aéreos ganhos, %", "Golos de cabeça/90"],
+    "Cruzador": ["Cruzamentos/90", "Cruzamentos certos, %", "Passes para a área de penálti/90"],
+    "Driblador": ["Dribles/90", "Dribles com sucesso, %", "Acelerações/90"],
+    "Desarme": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Interseções/90"],
+    "Recuperador": ["Interseções/90", "Duelos defensivos/90", "Duelos defensivos ganhos, %", "Faltas/90"],
+    "Box-to-Box": ["Duelos/90", "Interseções/90", "Corridas progressivas/90", "Acelerações/90"],
+    "Assistente": ["Assistências/90", "Assistências esperadas/90", "Passes chave/90", "Passes inteligentes/90", "Passes inteligentes certos, %"],
+    "Finalizador": ["Golos/90", "Remates/90", "Remates à baliza, %", "Golos esperados/90", "Toques na área/90"],
+    "Acelerador": ["Corridas progressivas/90", "Acelerações/90"],
+    "Pressionador": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Acções atacantes com sucesso/90"],
+    "Movimentador": ["Acelerações/90", "Corridas progressivas/90", "Passes recebidos/90"],
+    "Especialista em Bola Parada": ["Assistências por bola parada/90", "Passes chave por bola parada/90"],
+}
+
+# Pesos definidos para cada métrica dentro de um Estilo. Usado para calcular o 'Score Ponderado'.
+# Um peso maior (ex: 3.0) indica uma métrica mais crítica para aquele estilo.
+pesos_por_estilo = {
+    "Construtor": {"Passes certos, %": 3.0, "Passes progressivos certos, %": 2.5, "Passes progressivos/90": 1.5, "Passes/90": 1.0,},
+    "Assistente": {"Assistências/90": 3.0, "Passes chave/90": 2.5, "Assistências esperadas/90": 2.0, "Passes inteligentes certos, %": 1.5,},
+    "Driblador": {"Dribles com sucesso, %": 2.5, "Dribles/90": 1.5, "Acelerações/90": 1.0,},
+    "Finalizador": {"Golos/90": 3.0, "Golos esperados/90": 2.5, "Remates à baliza, %": 1.5, "Remates/90": 1.0,},
+    "Defensor": {"Duelos defensivos ganhos, %": 3.0, "Interseções/90": 2.5, "Cortes/90": 2.0, "Duelos defensivos/90": 1.0, "Faltas/90": 1.0,},
+    "Líder de Defesa": {"Duelos aéreos ganhos, %": 3.0, "Ações defensivas com êxito/90": 2.0,},
+    "Lançador": {"Passes longos certos, %": 3.0, "Passes em profundidade certos, %": 2.5, "Passes longos/90": 1.5, "Passes em profundidade/90": 1.0,},
+    "Cruzador": {"Cruzamentos certos, %": 3.0, "Passes para a área de penálti/90": 2.0, "Cruzamentos/90": 1.0,},
+    "Desarme": {"Duelos defensivos ganhos, %": 3.0, "Interseções/90": 2.0, "Duelos defensivos/90": 1.5,},
+    "Recuperador": {"Duelos defensivos ganhos, %": 3.0, "Interseções/90": 2.5, "Duelos defensivos/90": 1.5, "Faltas/90": 1.0,},
+    "Box-to-Box": {"Corridas progressivas/90": 2.5, "Interseções/90": 2.0, "Duelos/90": 1.5, "Acelerações/90": 1.0,},
+    "Distribuidor": {"Passes certos, %": 3.0, "Passes curtos / médios precisos, %": 2.5, "Passes curtos / médios /90": 1.5,},
+    "Acelerador": {"Corridas progressivas/90": 2.5, "Acelerações/90": 1.5,},
+    "Pressionador": {"Duelos defensivos ganhos, %": 3.0, "Acções atacantes com sucesso/90": 2.0, "Duelos defensivos/90": 1.0,},
+    "Dominador Aéreo": {"Golos de cabeça/90": 3.0, "Duelos aéreos ganhos, %": 2.0, "Duelos aéreos/90": 1.0,},
+    "Movimentador": {"Passes recebidos/90": 2.5, "Corridas progressivas/90": 1.5, "Acelerações/90": 1.0,},
+    "Shot Stopper": {"Defesas, %": 3.0, "Golos expectáveis defendidos por 90´": 2.5, "Golos sofridos/90": 1.0,},
+    "Sweeper Keeper": {"Saídas/90": 2.0, "Duelos aéreos ganhos, %": 3.0, "Duelos aéreos/90": 1.0,},
+}
+
+# KPIs agrupados para a visualização no Gráfico de Radar (Pizza Plot) e para a Similaridade.
+kpis_por_posicao = {
+    "Goleiro": {
+        "Defendendo": ["Defesas, %", "Golos sofridos/90", "Golos sofridos esperados/90", "Golos expectáveis defendidos por 90´", "Remates sofridos/90", "Jogos sem sofrer golos"],
+        "Posse": ["Passes certos, %", "Passes longos/90", "Passes longos certos, %", "Passes para trás recebidos pelo guarda-redes/90", "Saídas/90"],
+        "Atacando": []
+    },
+    "Zagueiro": {
+        "Defendendo": ["Ações defensivas com êxito/90", "Duelos defensivos/90", "Duelos defensivos ganhos, %", "Cortes/90", "Cortes de carrinho ajust. à posse", "Remates intercetados/90", "Interseções/90", "Interceções ajust. à posse", "Duelos aéreos/90", "Duelos aéreos ganhos, %"],
+        "Posse": ["Passes/90", "Passes certos, %", "Passes para a frente/90", "Passes para a frente certos, %", "Passes laterais/90", "Passes laterais certos, %", "Passes progressivos/90", "Passes progressivos certos, %"],
+        "Atacando": ["Golos", "Golos de cabeça/90", "Assistências/90"]
+    },
+    "Lateral": {
+        "Defendendo": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Interseções/90", "Cortes/90"],
+        "Posse": ["Passes/90", "Passes certos, %", "Passes progressivos/90", "Passes progressivos certos, %", "Corridas progressivas/90"],
+        "Atacando": ["Assistências/90", "Assistências esperadas/90", "Cruzamentos/90", "Cruzamentos certos, %", "Cruzamentos do flanco esquerdo/90", "Cruzamentos precisos do flanco esquerdo, %", "Cruzamentos do flanco direito/90", "Cruzamentos precisos do flanco direito, %", "Acelerações/90"]
+    },
+    "Volante": {
+        "Defendendo": ["Duelos defensivos/90", "Duelos defensivos ganhos, %", "Interseções/90", "Faltas/90"],
+        "Posse": ["Passes/90", "Passes certos, %", "Passes curtos / médios /90", "Passes curtos / médios precisos, %", "Passes para a frente/90", "Passes para a frente certos, %", "Passes progressivos/90", "Passes progressivos certos, %"],
+        "Atacando": ["Assistências/90", "Assistências esperadas/90", "Passes chave/90", "Passes inteligentes/90"]
+    },
+    "Meia-Ofensivo": {
+        "Defendendo": ["Duelos/90", "Duelos ganhos, %"],
+        "Posse": ["Passes/90", "Passes certos, %", "Passes chave/90", "Passes para terço final/90", "Passes certos para terço final, %", "Passes para a área de penálti/90", "Passes precisos para a área de penálti, %", "Passes inteligentes/90"],
+        "Atacando": ["Golos/90", "Golos esperados/90", "Assistências/90", "Assistências esperadas/90", "Dribles/90", "Dribles com sucesso, %", "Toques na área/90"]
+    },
+    "Extremo": {
+        "Defendendo": ["Duelos ofensivos/90", "Duelos ofensivos ganhos, %"],
+        "Posse": ["Passes/90", "Passes certos, %", "Passes progressivos/90", "Passes progressivos certos, %", "Corridas progressivas/90", "Acelerações/90"],
+        "Atacando": ["Golos/90", "Golos esperados/90", "Assistências/90", "Assistências esperadas/90", "Cruzamentos/90", "Cruzamentos certos, %", "Dribles/90", "Dribles com sucesso, %", "Toques na área/90"]
+    },
+    "Centroavante": {
+        "Defendendo": ["Ações defensivas com êxito/90", "Duelos aéreos/90", "Duelos aéreos ganhos, %"],
+        "Posse": ["Passes/90", "Passes certos, %", "Passes recebidos/90", "Passes longos recebidos/90"],
+        "Atacando": ["Golos/90", "Golos sem ser por penálti/90", "Golos esperados/90", "Golos de cabeça/90", "Remates/90", "Remates à baliza, %", "Toques na área/90", "Acelerações/90"]
+    }
+}
+
+# Lista de métricas em que um valor MENOR é melhor (para inverter o ranqueamento).
+metricas_negativas = ["Golos sofridos/90", "Faltas/90"]
+
+# Cores de cada grupo de KPIs no Gráfico de Radar.
+grupo_cores = {"Atacando": "#FF5733", "Defendendo": "#33FF57", "Posse": "#3375FF"}
@@ -0,0 +1,204 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# -------------------------------
+# Conversão Numérica Vetorizada (formato brasileiro/português)
+# -------------------------------
+# As exportações do Wyscout em português trazem números como texto no formato "1.234,5"
+# (ponto como separador de milhar e vírgula como decimal). Em vez de tentar converter
+# cada coluna de texto às cegas, uma amostra de cada coluna decide primeiro se ela é
+# numérica e em qual formato; só então a coluna inteira é convertida em uma única passada.
+# Os exemplos de `detectar_formato` servem de verificação de regressão:
+#   python -m doctest conversao_numerica.py
+
+# Formato brasileiro: "1.234,5", "1234,5", "12" (milhar opcional, vírgula decimal). Um grupo
+# de milhar nunca começa com zero: "0.123" não é "123".
+_PADRAO_VIRGULA = r"[+-]?(?:[1-9]\d{0,2}(?:\.\d{3})+|\d+)(?:,\d+)?"
+# Formato com ponto decimal: "1234.5", "0.75".
+_PADRAO_PONTO = r"[+-]?\d+(?:\.\d+)?"
+
+# Quantidade de valores não nulos inspecionados por coluna na detecção.
+TAMANHO_AMOSTRA = 200
+
+
+def _amostra(serie, tamanho):
+    # Pega valores espalhados pela coluna (e não só o início), sem sorteio, para que a
+    # detecção seja determinística entre execuções.
+    valores = serie.dropna()
+    if len(valores) > tamanho:
+        passo = len(valores) // tamanho
+        valores = valores.iloc[::passo].iloc[:tamanho]
+    return valores
+
+
+def detectar_formato(serie, tamanho_amostra=TAMANHO_AMOSTRA):
+    """
+    Classifica uma coluna de texto a partir de uma amostra.
+
+    Retorna "virgula" (formato "1.234,5"), "ponto" (formato "1234.5") ou None quando a
+    coluna não é numérica. Sem vírgula, um único ponto é ambíguo ("1.250" pode ser milhar
+    ou decimal) e é lido como decimal: o formato brasileiro só é escolhido quando algum
+    valor prova o agrupamento (uma vírgula ou dois ou mais pontos).
+
+    >>> detectar_formato(pd.Series(["0.123", "0.456", "1.250", "0.300"]))
+    'ponto'
+    >>> detectar_formato(pd.Series(["1.234.567", "12"]))
+    'virgula'
+    >>> detectar_formato(pd.Series(["1.234,5", "0,75"]))
+    'virgula'
+    >>> converter_colunas_numericas(pd.DataFrame({"xG": ["0.123", "0.456", "1.250", "0.300"]}))[0]["xG"].tolist()
+    [0.123, 0.456, 1.25, 0.3]
+    """
+    amostra = _amostra(serie, tamanho_amostra)
+    if amostra.empty:
+        return "ponto"
+
+    texto = amostra.astype(str).str.strip()
+    if texto.str.contains(",", regex=False).any():
+        return "virgula" if texto.str.fullmatch(_PADRAO_VIRGULA).all() else None
+    if texto.str.fullmatch(_PADRAO_PONTO).all():
+        return "ponto"
+    # Sem vírgula, mas com valores como "1.234.567": ponto só pode ser milhar.
+    return "virgula" if texto.str.fullmatch(_PADRAO_VIRGULA).all() else None
+
+
+def _converter_misto(serie, formato, forcar=False):
+    # Caminho para colunas "object" com valores que não são texto (comum em XLSX, onde
+    # números e textos se misturam): os textos passam pelo pandas e os demais valores são
+    # convertidos diretamente, sem manipular separadores.
+    convertida = pd.Series(float("nan"), index=serie.index)
+    e_texto = serie.map(type).eq(str)
+    texto = serie[e_texto].str.strip()
+    if formato == "virgula":
+        texto = texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    convertida[e_texto] = pd.to_numeric(texto, errors="coerce")
+    convertida[~e_texto] = pd.to_numeric(serie[~e_texto], errors="coerce")
+    if not forcar and (convertida.isna() & serie.notna()).any():
+        return None
+    return convertida.astype("float64")
+
+
+def converter_serie(serie, formato, forcar=False):
+    """
+    Converte a coluna inteira no formato indicado.
+
+    Se algum valor falhar, retorna None; com `forcar=True`, os valores inválidos viram nulos.
+    """
+    try:
+        texto = pa.array(serie.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _converter_misto(serie, formato, forcar)
+
+    # Troca de separadores e conversão acontecem nos kernels do Arrow, sem laços em Python
+    # e sem a cópia intermediária de `astype(str)`.
+    texto = pc.utf8_trim_whitespace(texto)
+    if formato == "virgula":
+        texto = pc.replace_substring(pc.replace_substring(texto, ".", ""), ",", ".")
+    try:
+        valores = pc.cast(texto, pa.float64())
+    except pa.ArrowInvalid:
+        if not forcar:
+            return None
+        return pd.to_numeric(pd.Series(texto.to_numpy(zero_copy_only=False), index=serie.index), errors="coerce").astype("float64")
+    return pd.Series(valores.to_numpy(zero_copy_only=False), index=serie.index)
+
+
+def converter_colunas_numericas(df, tamanho_amostra=TAMANHO_AMOSTRA):
+    """
+    Converte para float todas as colunas de texto que são numéricas.
+
+    Retorna a base convertida e a lista das colunas convertidas. Colunas de texto (ex:
+    "Jogador") são descartadas já na amostra, sem copiar a coluna inteira.
+    """
+    convertidas = []
+    for col in df.columns:
+        if df[col].dtype != "object":
+            continue
+        formato = detectar_formato(df[col], tamanho_amostra)
+        if formato is None:
+            continue
+        convertida = converter_serie(df[col], formato)
+        if convertida is not None:
+            df[col] = convertida
+            convertidas.append(col)
+    return df, convertidas
+
+
+class ConversorLotes:
+    """
+    Conversão numérica de uma base lida em lotes, com o mesmo formato por coluna em todos eles.
+
+    O formato de cada coluna é decidido uma única vez, pelas mesmas regras de
+    `detectar_formato`, no primeiro lote em que ela traz texto. Lotes que o pandas já leu
+    como número não decidem nada enquanto só tiverem inteiros (que valem nos dois formatos);
+    valores com casas decimais lidos pelo pandas só podem ter vindo do ponto decimal. Nos
+    lotes seguintes a coluna é convertida com o formato decidido e os valores que não são
+    número em nenhum formato (ex: "-") viram nulos, de modo que todos os lotes saem com o
+    mesmo tipo; colunas decididas como texto nunca são convertidas.
+
+    Um valor válido apenas no outro formato (ex: "0,25" numa coluna decidida como "ponto")
+    mostra que a decisão dos lotes anteriores estava errada e levanta ValueError: os lotes
+    já convertidos não podem ser refeitos, e quem lê a base deve detectar de novo sobre o
+    arquivo inteiro (ver `ingestao.carregar_compacto`).
+    """
+
+    def __init__(self, tamanho_amostra=TAMANHO_AMOSTRA):
+        self.tamanho_amostra = tamanho_amostra
+        self.formatos = {}  # coluna -> "virgula", "ponto" ou None (texto)
+
+    def converter(self, df):
+        """Converte um lote; retorna o lote e a lista das colunas convertidas de texto nele."""
+        convertidas = []
+        for col in df.columns:
+            serie = df[col]
+            formato = self.formatos.get(col, "indefinido")
+            if serie.dtype != "object":
+                self._verificar_lido_pelo_pandas(col, serie, formato)
+                continue
+            if formato is None:
+                continue
+            if formato == "indefinido":
+                if serie.isna().all():
+                    # Ainda sem valores para decidir: o lote vazio vira nulos numéricos, que
+                    # se juntam a qualquer um dos dois tipos sem mudar a coluna.
+                    df[col] = pd.Series(float("nan"), index=df.index)
+                    continue
+                formato = detectar_formato(serie, self.tamanho_amostra)
+                convertida = converter_serie(serie, formato) if formato is not None else None
+                self.formatos[col] = formato if convertida is not None else None
+            else:
+                convertida = converter_serie(serie, formato, forcar=True)
+                self._verificar_invalidos(col, serie[convertida.isna() & serie.notna()], formato)
+            if convertida is not None:
+                df[col] = convertida
+                convertidas.append(col)
+        return df, convertidas
+
+    def _verificar_lido_pelo_pandas(self, col, serie, formato):
+        # O pandas só lê como número valores sem vírgula; casas decimais vêm do ponto.
+        if serie.dtype.kind != "f":
+            return
+        fracionarios = (serie.dropna() % 1 != 0).any()
+        if not fracionarios:
+            return
+        if formato == "indefinido":
+            self.formatos[col] = "ponto"
+        elif formato == "virgula":
+            raise ValueError(
+                f"A coluna '{col}' foi lida no formato \"1.234,5\" nos lotes anteriores, mas este lote "
+                "traz valores com ponto decimal; o formato precisa ser detectado no arquivo inteiro."
+            )
+
+    @staticmethod
+    def _verificar_invalidos(col, invalidos, formato):
+        outro = _PADRAO_PONTO if formato == "virgula" else _PADRAO_VIRGULA
+        proprio = _PADRAO_VIRGULA if formato == "virgula" else _PADRAO_PONTO
+        texto = invalidos.astype(str).str.strip()
+        conflitantes = texto[texto.str.fullmatch(outro) & ~texto.str.fullmatch(proprio)]
+        if not conflitantes.empty:
+            raise ValueError(
+                f"A coluna '{col}' foi lida no formato '{formato}' nos lotes anteriores, mas este lote "
+                f"traz {conflitantes.iloc[0]!r}, válido apenas no outro formato; o formato precisa ser "
+                "detectado no arquivo inteiro."
+            )
@@ -0,0 +1,292 @@
+import argparse
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import ingestao
+from config_estilos import metricas_negativas
+
+# -------------------------------
+# Percentis por Esboços de Quantis (bases maiores que a memória)
+# -------------------------------
+# Para comparar jogadores com um pool de várias ligas sem carregar todas as exportações, cada
+# métrica é resumida em um esboço KLL: uma pilha de "compactadores" em que o nível h guarda
+# valores que representam 2^h observações cada. Quando um nível enche, ele é ordenado e metade
+# dos valores (os de posição par ou ímpar, sorteado) sobe para o nível seguinte com peso dobrado.
+# O esboço é construído em uma única passada pelos lotes das exportações, ocupa poucos KB por
+# métrica, é salvo em disco (.npz) e esboços de ligas diferentes se unem sem reler os dados.
+#
+# Erro: com capacidade k, o posto estimado de um valor difere do posto exato em no máximo
+# ~1,33% de n com 99% de confiança para k = 200 (ajuste publicado pela biblioteca DataSketches,
+# cujo KLL este segue: capacidades decaindo em 2/3 por nível, mínimo de 8). Em percentil: até
+# ~1,3 ponto para k = 200 e ~0,7 ponto para k = 400, independente do tamanho do pool.
+# `erro_percentil(k)` devolve esse limite e o benchmark mede o erro real.
+# Abaixo de ~k observações nada é compactado e os percentis são exatos.
+# Exemplo:
+#   python esbocos.py construir brasileirao.csv --saida brasil.npz
+#   python esbocos.py construir argentina.csv --saida argentina.npz
+#   python esbocos.py mesclar brasil.npz argentina.npz --saida global.npz
+
+# Capacidade padrão dos esboços (maior = mais preciso e maior em disco).
+K_PADRAO = 200
+# Fator de decaimento das capacidades dos níveis inferiores e capacidade mínima de um nível.
+DECAIMENTO = 2 / 3
+CAPACIDADE_MINIMA = 8
+
+VERSAO_FORMATO = 1
+
+
+def erro_percentil(k=K_PADRAO):
+    """Erro máximo esperado (em pontos de percentil, 99% de confiança) de um esboço com capacidade `k`."""
+    # Ajuste empírico do erro de posto do KLL publicado pela DataSketches (1,33% para k = 200).
+    return 100 * 2.296 / k ** 0.9723
+
+
+class EsbocoKLL:
+    """Esboço de quantis de uma métrica, alimentado em lotes e mesclável com outros esboços."""
+
+    def __init__(self, k=K_PADRAO, semente=None):
+        self.k = int(k)
+        self.n = 0
+        self.niveis = [np.empty(0)]
+        self._rng = np.random.default_rng(semente)
+        self._tabela = None
+
+    def _capacidade(self, nivel):
+        profundidade = len(self.niveis) - 1 - nivel
+        return max(CAPACIDADE_MINIMA, int(np.ceil(self.k * DECAIMENTO ** profundidade)))
+
+    def _compactar(self):
+        # Sobe metade dos valores dos níveis cheios, do mais baixo ao mais alto; criar um nível
+        # novo muda as capacidades dos de baixo, então repete até nenhum passar do limite.
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) <= self._capacidade(nivel):
+                nivel += 1
+                continue
+            if nivel + 1 == len(self.niveis):
+                self.niveis.append(np.empty(0))
+            itens = np.sort(itens)
+            # Com quantidade ímpar, um valor fica no nível para que o peso total se conserve.
+            resto = itens[-1:] if len(itens) % 2 else itens[:0]
+            pares = itens[: len(itens) - len(resto)]
+            promovidos = pares[self._rng.integers(2)::2]
+            self.niveis[nivel] = resto
+            self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+            nivel = 0
+
+    def atualizar(self, valores):
+        """Acrescenta um lote de observações (nulos são ignorados)."""
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return self
+        self.n += len(valores)
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+        self._tabela = None
+        return self
+
+    def mesclar(self, outro):
+        """Une as observações de `outro` a este esboço (mesmo `k`), sem os dados originais."""
+        if outro.k != self.k:
+            raise ValueError(f"Esboços com capacidades diferentes ({self.k} e {outro.k}) não podem ser mesclados.")
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self._compactar()
+        self._tabela = None
+        return self
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos valores guardados."""
+        return sum(itens.nbytes for itens in self.niveis)
+
+    def _ordenados(self):
+        # Valores guardados em ordem e o peso acumulado antes de cada um (refeito após mudanças).
+        if self._tabela is None:
+            itens = np.concatenate(self.niveis)
+            pesos = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.niveis)])
+            ordem = np.argsort(itens, kind="stable")
+            self._tabela = (itens[ordem], np.concatenate([[0.0], np.cumsum(pesos[ordem])]))
+        return self._tabela
+
+    def percentis(self, valores, negativa=False):
+        """
+        Percentil (0 a 100) de cada valor em relação às observações do esboço.
+
+        Segue a convenção de `calcular_percentis` (empates pela média, o próprio jogador conta
+        como uma observação); com `negativa`, valores menores recebem percentis maiores.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        if self.n == 0:
+            return np.full(valores.shape, np.nan)
+        itens, acumulado = self._ordenados()
+        menores = acumulado[np.searchsorted(itens, valores, side="left")]
+        ate = acumulado[np.searchsorted(itens, valores, side="right")]
+        if negativa:
+            menores, ate = self.n - ate, self.n - menores
+        percentis = np.clip((menores + (ate - menores + 1) / 2) / self.n * 100, 0, 100)
+        percentis[np.isnan(valores)] = np.nan
+        return percentis
+
+
+class EsbocosPercentis:
+    """Um esboço por métrica, com as ligas (fontes) que o alimentaram."""
+
+    def __init__(self, k=K_PADRAO, semente=0):
+        self.k = int(k)
+        self.esbocos = {}
+        self.fontes = []
+        self._rng = np.random.default_rng(semente)
+
+    @property
+    def metricas(self):
+        return list(self.esbocos)
+
+    @property
+    def n(self):
+        """Quantidade de observações (maior entre as métricas)."""
+        return max((esboco.n for esboco in self.esbocos.values()), default=0)
+
+    @property
+    def nbytes(self):
+        return sum(esboco.nbytes for esboco in self.esbocos.values())
+
+    def _esboco(self, metrica):
+        if metrica not in self.esbocos:
+            self.esbocos[metrica] = EsbocoKLL(self.k, semente=self._rng.integers(2 ** 32))
+        return self.esbocos[metrica]
+
+    def atualizar(self, df, metricas=None):
+        """
+        Acrescenta um lote (DataFrame já limpo); por padrão, todas as métricas numéricas.
+
+        Uma das `metricas` pedidas que exista no lote mas não seja numérica levanta ValueError,
+        em vez de deixar o lote fora do esboço sem aviso (o que enviesaria os percentis).
+        """
+        if metricas is None:
+            metricas = [c for c in df.columns if c not in ingestao.COLUNAS_IDENTIDADE and pd.api.types.is_numeric_dtype(df[c])]
+        for metrica in metricas:
+            if metrica not in df.columns:
+                continue
+            if not pd.api.types.is_numeric_dtype(df[metrica]):
+                raise ValueError(f"A métrica '{metrica}' não é numérica neste lote; os esboços não foram atualizados com ela.")
+            self._esboco(metrica).atualizar(df[metrica].to_numpy(dtype=np.float64, na_value=np.nan))
+        return self
+
+    def mesclar(self, outro):
+        """Une os esboços de `outro` (por exemplo, de outra liga) a estes."""
+        if outro.k != self.k:
+            raise ValueError(f"Esboços com capacidades diferentes ({self.k} e {outro.k}) não podem ser mesclados.")
+        for metrica, esboco in outro.esbocos.items():
+            self._esboco(metrica).mesclar(esboco)
+        self.fontes.extend(f for f in outro.fontes if f not in self.fontes)
+        return self
+
+    def percentis(self, df, metricas, negativas=metricas_negativas, linhas=None):
+        """
+        Percentis das `metricas` de `df` em relação ao pool dos esboços.
+
+        Mesmo formato de `calcular_percentis`: uma coluna por métrica presente em `df` e nos
+        esboços, índice das `linhas` pedidas (ou da base inteira).
+        """
+        metricas = [m for m in dict.fromkeys(metricas) if m in df.columns and m in self.esbocos]
+        tabela = df.iloc[linhas] if linhas is not None else df
+        percentis = {
+            m: self.esbocos[m].percentis(
+                pd.to_numeric(tabela[m], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan),
+                negativa=m in negativas,
+            )
+            for m in metricas
+        }
+        return pd.DataFrame(percentis, index=tabela.index, columns=metricas)
+
+    def salvar(self, caminho_ou_arquivo):
+        """Salva os esboços em um .npz (os níveis de cada métrica e um cabeçalho em JSON)."""
+        cabecalho = {
+            "versao": VERSAO_FORMATO,
+            "k": self.k,
+            "fontes": self.fontes,
+            "metricas": [{"nome": m, "n": e.n, "niveis": len(e.niveis)} for m, e in self.esbocos.items()],
+        }
+        arrays = {"cabecalho": np.array(json.dumps(cabecalho, ensure_ascii=False))}
+        for i, esboco in enumerate(self.esbocos.values()):
+            for nivel, itens in enumerate(esboco.niveis):
+                arrays[f"m{i}_n{nivel}"] = itens
+        if isinstance(caminho_ou_arquivo, str):
+            pasta = os.path.dirname(caminho_ou_arquivo)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+        np.savez_compressed(caminho_ou_arquivo, **arrays)
+
+    @classmethod
+    def carregar(cls, caminho_ou_dados):
+        """Lê esboços salvos por `salvar` (caminho do .npz ou os bytes do arquivo)."""
+        fonte = io.BytesIO(caminho_ou_dados) if isinstance(caminho_ou_dados, bytes) else caminho_ou_dados
+        with np.load(fonte, allow_pickle=False) as arquivo:
+            cabecalho = json.loads(str(arquivo["cabecalho"]))
+            if cabecalho.get("versao") != VERSAO_FORMATO:
+                raise ValueError("Arquivo de esboços em formato desconhecido.")
+            conjunto = cls(cabecalho["k"])
+            conjunto.fontes = list(cabecalho["fontes"])
+            for i, info in enumerate(cabecalho["metricas"]):
+                esboco = conjunto._esboco(info["nome"])
+                esboco.niveis = [arquivo[f"m{i}_n{nivel}"] for nivel in range(info["niveis"])]
+                esboco.n = int(info["n"])
+        return conjunto
+
+
+def construir_esbocos(caminhos, metricas=None, k=K_PADRAO):
+    """
+    Esboços de todas as exportações em `caminhos`, em uma única passada por lotes.
+
+    Cada arquivo é lido e limpo em lotes (`ingestao.ler_em_lotes`, com o mesmo formato
+    numérico por coluna em todos os lotes); só os esboços ficam em memória entre um lote e
+    outro. Por padrão entram as métricas usadas pela aplicação.
+    """
+    metricas = metricas or [c for c in ingestao.colunas_necessarias() if c not in ingestao.COLUNAS_IDENTIDADE]
+    conjunto = EsbocosPercentis(k)
+    for caminho in caminhos:
+        for lote in ingestao.ler_em_lotes(os.path.basename(caminho), caminho, metricas):
+            conjunto.atualizar(lote, metricas)
+        conjunto.fontes.append(os.path.splitext(os.path.basename(caminho))[0])
+    return conjunto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Constrói e mescla esboços de quantis para percentis em pools de várias ligas.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    construir = comandos.add_parser("construir", help="Lê exportações (CSV ou XLSX) em lotes e salva os esboços.")
+    construir.add_argument("arquivos", nargs="+", help="Exportações do Wyscout; todas entram no mesmo esboço.")
+    construir.add_argument("--k", type=int, default=K_PADRAO, help=f"Capacidade dos esboços (padrão: {K_PADRAO}).")
+    construir.add_argument("--saida", default="esbocos.npz", help="Arquivo de saída (.npz).")
+
+    mesclar = comandos.add_parser("mesclar", help="Une esboços já salvos (por exemplo, um por liga).")
+    mesclar.add_argument("esbocos", nargs="+", help="Arquivos .npz gerados por `construir` ou `mesclar`.")
+    mesclar.add_argument("--saida", default="esbocos.npz", help="Arquivo de saída (.npz).")
+    args = parser.parse_args(argv)
+
+    if args.comando == "construir":
+        conjunto = construir_esbocos(args.arquivos, k=args.k)
+    else:
+        conjunto = EsbocosPercentis.carregar(args.esbocos[0])
+        for caminho in args.esbocos[1:]:
+            conjunto.mesclar(EsbocosPercentis.carregar(caminho))
+    conjunto.salvar(args.saida)
+    print(
+        f"{len(conjunto.metricas)} métricas, {conjunto.n} observações de {len(conjunto.fontes)} fonte(s), "
+        f"erro máximo esperado de ~{erro_percentil(conjunto.k):.1f} ponto(s) de percentil; salvo em {args.saida}"
+    )
+
+
+if __name__ == "__main__":
+    main()
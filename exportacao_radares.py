@@ -0,0 +1,149 @@
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import radar
+
+# -------------------------------
+# Exportação em Lote de Radares (PDF ou ZIP de PNGs)
+# -------------------------------
+# O matplotlib usa CPU intensamente e não é seguro entre threads, então cada radar é
+# desenhado em um processo separado. As imagens voltam como PNG e são montadas em um único
+# PDF (uma página por jogador) ou em um ZIP. A exportação roda em segundo plano, para não
+# travar a sessão do Streamlit, e informa o progresso por um dicionário compartilhado.
+#
+# Os processos de desenho formam um único pool de longa duração, criado na primeira exportação
+# já com os caminhos das fontes e reaproveitado pelas seguintes: o custo de iniciar um processo
+# e importar o matplotlib/mplsoccer é pago uma vez por processo, não a cada exportação. Várias
+# sessões podem exportar ao mesmo tempo; cada exportação mantém no máximo um radar por processo
+# na fila do pool, para que uma exportação grande não faça as outras esperarem até o fim dela.
+
+# Exportações coordenadas ao mesmo tempo e processos de desenho (padrão: todos os núcleos).
+EXPORTACOES_SIMULTANEAS = int(os.environ.get("PROSCOUT_EXPORTACOES", "4"))
+PROCESSOS_RADAR = int(os.environ.get("PROSCOUT_PROCESSOS_RADAR", "0")) or os.cpu_count() or 1
+
+# Threads que coordenam as exportações em segundo plano.
+_coordenador = ThreadPoolExecutor(max_workers=EXPORTACOES_SIMULTANEAS, thread_name_prefix="exportacao_radares")
+
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def preparar_radares(df_final, posicao, estilos, top_n):
+    """
+    Monta os dados dos radares dos `top_n` primeiros jogadores de um ranking já ordenado.
+
+    Retorna uma lista de (nome, params, valores, cores, titulo), na ordem do ranking.
+    """
+    tarefas = []
+    for _, linha in df_final.head(top_n).iterrows():
+        params, valores, cores = radar.montar_radar(linha, posicao)
+        if not params:
+            continue
+        titulo = f"{linha.get('Jogador', 'N/A')} - {linha.get('Equipa', 'N/A')} ({', '.join(estilos)})"
+        tarefas.append((str(linha.get("Jogador", "N/A")), params, valores, cores, titulo))
+    return tarefas
+
+
+def _renderizar(tarefa):
+    # Executado nos processos de trabalho: cada um carrega as fontes (já resolvidas) uma única vez.
+    _, params, valores, cores, titulo = tarefa
+    return radar.renderizar_radar(params, valores, cores, titulo)
+
+
+def _pool_processos():
+    # Criado sob demanda (a aplicação não paga pelos processos se ninguém exportar).
+    global _pool
+    with _trava_pool:
+        if _pool is None:
+            # "spawn" evita herdar as threads e travas do servidor Streamlit no fork. As fontes
+            # são resolvidas aqui uma vez; os processos recebem os caminhos prontos.
+            _pool = ProcessPoolExecutor(max_workers=PROCESSOS_RADAR, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=radar.usar_caminhos_fontes, initargs=(radar.caminhos_fontes(),))
+        return _pool
+
+
+def _descartar_pool(pool):
+    # Um processo que morre quebra o pool inteiro; a próxima exportação cria um novo.
+    global _pool
+    with _trava_pool:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _nome_arquivo(posicao, nome):
+    return f"{posicao:02d}_{re.sub(r'[^A-Za-z0-9À-ÿ_-]+', '_', nome).strip('_')}.png"
+
+
+def exportar_radares(tarefas, formato="pdf", n_processos=None, progresso=None):
+    """
+    Renderiza os radares em paralelo e retorna o arquivo final em bytes.
+
+    `formato` é "pdf" (um PDF com uma página por radar) ou "zip" (um PNG por radar). Os
+    radares são desenhados no pool de processos compartilhado, com no máximo `n_processos`
+    (padrão: o tamanho do pool) desta exportação em andamento ao mesmo tempo.
+    Se `progresso` for um dicionário, as chaves "feitos" e "total" são atualizadas. Sem
+    nenhuma tarefa (nenhum jogador com métricas de radar), levanta ValueError em vez de
+    gerar um arquivo vazio.
+    """
+    if not tarefas:
+        raise ValueError("Nenhum jogador com métricas de radar para exportar.")
+    if progresso is not None:
+        progresso.update(feitos=0, total=len(tarefas))
+
+    imagens = [None] * len(tarefas)
+    em_andamento = max(1, min(n_processos or PROCESSOS_RADAR, len(tarefas)))
+    pool = _pool_processos()
+    pendentes = iter(enumerate(tarefas))
+    futuros = {}
+    try:
+        while True:
+            # Repõe a janela desta exportação à medida que os radares ficam prontos.
+            for i, tarefa in pendentes:
+                futuros[pool.submit(_renderizar, tarefa)] = i
+                if len(futuros) >= em_andamento:
+                    break
+            if not futuros:
+                break
+            prontos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                imagens[futuros.pop(futuro)] = futuro.result()
+                if progresso is not None:
+                    progresso["feitos"] += 1
+    except BrokenProcessPool:
+        _descartar_pool(pool)
+        raise
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+    saida = io.BytesIO()
+    if formato == "zip":
+        with zipfile.ZipFile(saida, "w", zipfile.ZIP_DEFLATED) as arquivo_zip:
+            for i, (tarefa, imagem) in enumerate(zip(tarefas, imagens), start=1):
+                arquivo_zip.writestr(_nome_arquivo(i, tarefa[0]), imagem)
+    else:
+        # O Pillow só é carregado quando a exportação é em PDF.
+        from PIL import Image
+
+        paginas = [Image.open(io.BytesIO(imagem)).convert("RGB") for imagem in imagens]
+        paginas[0].save(saida, format="PDF", save_all=True, append_images=paginas[1:], resolution=radar.DPI_RADAR)
+    return saida.getvalue()
+
+
+def iniciar_exportacao(tarefas, formato="pdf", n_processos=None):
+    """
+    Inicia a exportação em segundo plano.
+
+    Retorna (futuro, progresso): o futuro resolve para os bytes do arquivo e o dicionário
+    de progresso pode ser consultado a qualquer momento pela interface.
+    """
+    progresso = {"feitos": 0, "total": len(tarefas)}
+    futuro = _coordenador.submit(exportar_radares, tarefas, formato, n_processos, progresso)
+    return futuro, progresso
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Filtros de Idade e Minutos Jogados
+# -------------------------------
+# Compartilhados entre a interface e os scripts em lote, para que todos usem exatamente o
+# mesmo recorte da base. As colunas filtráveis são ordenadas uma única vez por base; cada
+# faixa vira um intervalo contíguo na ordem (searchsorted) e as faixas se combinam em uma
+# única máscara de linhas. O resultado é uma lista de posições de linhas: as páginas copiam
+# apenas as colunas de que precisam, em vez de copiar a base inteira a cada filtro.
+
+COLUNAS_FILTRO = ["Idade", "Minutos jogados:"]
+
+
+class IndiceFiltros:
+    """Valores ordenados das colunas filtráveis de uma base, para filtrar por faixas."""
+
+    def __init__(self, df):
+        self.n_linhas = len(df)
+        self._ordenadas = {}
+        for col in COLUNAS_FILTRO:
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+                valores = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                # Nulos ficam no fim da ordem e nunca entram em uma faixa.
+                ordem = np.argsort(valores, kind="stable")
+                ordenados = valores[ordem]
+                ordenados.flags.writeable = False
+                ordem.flags.writeable = False
+                self._ordenadas[col] = (ordenados, ordem)
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos valores ordenados e pelas ordens."""
+        return sum(valores.nbytes + ordem.nbytes for valores, ordem in self._ordenadas.values())
+
+    def linhas(self, faixas):
+        """
+        Posições (em ordem crescente) das linhas dentro de todas as faixas.
+
+        `faixas` mapeia coluna -> (mínimo, máximo), ambos inclusivos; colunas ausentes ou não
+        numéricas não filtram.
+        """
+        mascara = np.ones(self.n_linhas, dtype=bool)
+        for col, (minimo, maximo) in faixas.items():
+            if col not in self._ordenadas:
+                continue
+            valores, ordem = self._ordenadas[col]
+            inicio = np.searchsorted(valores, minimo, side="left")
+            fim = np.searchsorted(valores, maximo, side="right")
+            dentro = np.zeros(self.n_linhas, dtype=bool)
+            dentro[ordem[inicio:fim]] = True
+            mascara &= dentro
+        return np.flatnonzero(mascara)
+
+    def linhas_idade_minutos(self, idade_sel, minutos_sel):
+        """Atalho para as faixas de idade e de minutos jogados."""
+        return self.linhas({"Idade": idade_sel, "Minutos jogados:": minutos_sel})
+
+
+def filtrar_idade_minutos(df, idade_sel, minutos_sel):
+    """Retorna os jogadores dentro das faixas de idade e de minutos (colunas ausentes não filtram)."""
+    return df.take(IndiceFiltros(df).linhas_idade_minutos(idade_sel, minutos_sel))
+
+
+def recortar(df, linhas, colunas):
+    """Cópia apenas das `linhas` (posições) e das `colunas` existentes pedidas."""
+    colunas = [c for c in dict.fromkeys(colunas) if c in df.columns]
+    if linhas is None:
+        return df[colunas].copy()
+    return df.iloc[linhas, df.columns.get_indexer(colunas)]
@@ -0,0 +1,258 @@
+import hashlib
+import importlib.util
+import io
+import os
+import time
+
+import pandas as pd
+
+from config_estilos import metricas_por_estilo, kpis_por_posicao
+from conversao_numerica import ConversorLotes, converter_colunas_numericas
+
+# -------------------------------
+# Camada de Ingestão com Cache em Disco
+# -------------------------------
+# Cada arquivo carregado é identificado pelo hash do seu conteúdo. A leitura e a limpeza
+# acontecem uma única vez; o resultado é salvo em Parquet (colunar e tipado) e reaproveitado
+# nos reruns do Streamlit e em sessões futuras que enviarem o mesmo arquivo.
+
+# Diretório e tamanho máximo do cache (configuráveis por variável de ambiente).
+DIRETORIO_CACHE = os.environ.get("PROSCOUT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_proscout"))
+LIMITE_CACHE_MB = float(os.environ.get("PROSCOUT_CACHE_MAX_MB", "2048"))
+
+# Versão da rotina de limpeza: ao mudar a limpeza, artefatos antigos deixam de ser usados.
+VERSAO_LIMPEZA = "3"
+
+# Linhas por lote na leitura de CSVs no modo compacto (limita o pico de memória).
+TAMANHO_LOTE_CSV = int(os.environ.get("PROSCOUT_CSV_CHUNK", "50000"))
+
+# Leitor de XLSX: o calamine (escrito em Rust) lê planilhas bem mais rápido que o openpyxl e é
+# usado automaticamente quando o pacote `python-calamine` está instalado.
+MOTOR_EXCEL = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+# Colunas de identificação usadas pelas páginas, filtros e tabelas.
+COLUNAS_IDENTIDADE = ["Jogador", "Equipa", "Posição", "Idade", "Minutos jogados:"]
+# Colunas guardadas como categoria (poucos valores distintos repetidos em muitas linhas).
+COLUNAS_CATEGORICAS = ["Equipa", "Posição"]
+
+
+def colunas_necessarias():
+    """Colunas usadas pela aplicação: identificação + métricas dos estilos e dos radares."""
+    colunas = list(COLUNAS_IDENTIDADE)
+    for metricas in metricas_por_estilo.values():
+        colunas.extend(metricas)
+    for kpis in kpis_por_posicao.values():
+        for grupo_metrica in kpis.values():
+            colunas.extend(grupo_metrica)
+    return list(dict.fromkeys(colunas))
+
+
+def hash_conteudo(dados):
+    """Retorna o hash (SHA-256) dos bytes do arquivo, usado como chave do cache."""
+    return hashlib.sha256(dados).hexdigest()
+
+
+def limpar_base(df, conversor=None):
+    """
+    Aplica a limpeza inicial: remove colunas duplicadas e converte para número as colunas lidas como texto.
+
+    Na leitura em lotes, `conversor` (um `ConversorLotes`) mantém o formato de cada coluna
+    igual em todos os lotes.
+    """
+    # Remove colunas duplicadas que podem surgir de bases de dados mal formatadas.
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    # Detecta por amostragem as colunas numéricas em texto ("1.234,5" ou "1234.5") e as
+    # converte em uma única passada vetorizada. A lista das colunas convertidas fica em
+    # `df.attrs` (preservada no Parquet) para ser exibida na interface.
+    if conversor is not None:
+        df, convertidas = conversor.converter(df)
+    else:
+        df, convertidas = converter_colunas_numericas(df)
+    df.attrs["colunas_convertidas"] = convertidas
+    return df
+
+
+def ler_excel(dados, usecols=None, motor=None):
+    """
+    Lê a primeira planilha de um XLSX com o leitor mais rápido disponível (ou com `motor`).
+
+    `dados` são os bytes do arquivo ou o caminho dele em disco.
+    """
+    fonte = io.BytesIO(dados) if isinstance(dados, bytes) else dados
+    return pd.read_excel(fonte, usecols=usecols, engine=motor or MOTOR_EXCEL)
+
+
+def ler_arquivo(nome, dados):
+    """Lê os bytes de um CSV ou XLSX para um DataFrame do pandas (sem limpeza)."""
+    if nome.endswith(".csv"):
+        return pd.read_csv(io.BytesIO(dados))
+    return ler_excel(dados)
+
+
+def compactar_tipos(df):
+    """Converte as métricas para float32 e as colunas de equipe e posição para categoria."""
+    for col in df.columns:
+        if df[col].dtype == "float64":
+            df[col] = df[col].astype("float32")
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns and df[col].dtype == "object":
+            df[col] = df[col].astype("category")
+    return df
+
+
+def ler_em_lotes(nome, dados, colunas=None):
+    """
+    Gera a base em lotes já limpos (ver `limpar_base`), opcionalmente só com `colunas`.
+
+    `dados` são os bytes do arquivo ou o caminho dele em disco. CSVs são lidos em lotes de
+    `TAMANHO_LOTE_CSV` linhas, sem nunca manter o arquivo inteiro em memória quando lidos do
+    disco; o formato numérico de cada coluna é decidido uma vez e vale para todos os lotes
+    (ver `ConversorLotes`). Planilhas XLSX não têm leitura parcial no pandas e viram um
+    único lote.
+    """
+    selecionar = None if colunas is None else set(colunas).__contains__
+    if nome.endswith(".csv"):
+        fonte = io.BytesIO(dados) if isinstance(dados, bytes) else dados
+        conversor = ConversorLotes()
+        for lote in pd.read_csv(fonte, usecols=selecionar, chunksize=TAMANHO_LOTE_CSV):
+            yield limpar_base(lote, conversor)
+    else:
+        yield limpar_base(ler_excel(dados, usecols=selecionar))
+
+
+def carregar_compacto(nome, dados):
+    """
+    Lê apenas as colunas necessárias, já limpas e com tipos compactos.
+
+    CSVs são lidos em lotes de `TAMANHO_LOTE_CSV` linhas: cada lote é limpo e convertido
+    para float32 antes do próximo, então o pico de memória não inclui a base inteira em
+    texto/float64. No XLSX a leitura é única, mas também restrita às colunas necessárias.
+    Se um lote contradiz o formato numérico decidido nos anteriores (ver `ConversorLotes`),
+    o CSV é relido de uma vez e o formato é detectado sobre cada coluna inteira.
+    """
+    lotes = []
+    convertidas = {}
+    try:
+        for lote in ler_em_lotes(nome, dados, colunas_necessarias()):
+            convertidas.update(dict.fromkeys(lote.attrs["colunas_convertidas"]))
+            lotes.append(compactar_tipos(lote))
+    except ValueError:
+        if not nome.endswith(".csv"):
+            raise
+        fonte = io.BytesIO(dados) if isinstance(dados, bytes) else dados
+        selecionar = set(colunas_necessarias()).__contains__
+        return compactar_tipos(limpar_base(pd.read_csv(fonte, usecols=selecionar)))
+    if len(lotes) == 1:
+        return lotes[0]
+    df = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame()
+    # As categorias de cada lote podem diferir; a conversão final usa a base completa.
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype("object").astype("category")
+    df.attrs["colunas_convertidas"] = list(convertidas)
+    return df
+
+
+def _caminho_cache(chave, compacto):
+    modo = "-compacto" if compacto else ""
+    return os.path.join(DIRETORIO_CACHE, f"{chave}-v{VERSAO_LIMPEZA}{modo}.parquet")
+
+
+def _remover_excedentes():
+    # Evicção LRU: o mtime de cada artefato é atualizado a cada acerto, então os arquivos
+    # com mtime mais antigo são os menos usados recentemente e saem primeiro.
+    try:
+        artefatos = [os.path.join(DIRETORIO_CACHE, f) for f in os.listdir(DIRETORIO_CACHE) if f.endswith(".parquet")]
+    except FileNotFoundError:
+        return
+    artefatos = [(os.path.getmtime(a), os.path.getsize(a), a) for a in artefatos if os.path.exists(a)]
+    total = sum(tamanho for _, tamanho, _ in artefatos)
+    limite = LIMITE_CACHE_MB * 1024 * 1024
+    for _, tamanho, caminho in sorted(artefatos):
+        if total <= limite:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except OSError:
+            pass
+
+
+def carregar_base(nome, dados, chave=None, compacto=False):
+    """
+    Retorna a base limpa correspondente aos bytes enviados, usando o cache em disco.
+
+    Em caso de acerto, lê o Parquet salvo; caso contrário, lê o arquivo original, aplica
+    `limpar_base` e persiste o resultado antes de retorná-lo. Com `compacto=True`, apenas as
+    colunas necessárias são lidas, com tipos compactos (ver `carregar_compacto`).
+    """
+    chave = chave or hash_conteudo(dados)
+    caminho = _caminho_cache(chave, compacto)
+
+    if os.path.exists(caminho):
+        try:
+            df = pd.read_parquet(caminho)
+            # Marca o artefato como usado recentemente (base da evicção LRU).
+            os.utime(caminho, None)
+            return df
+        except Exception:
+            # Artefato corrompido ou incompatível: descarta e refaz a partir do original.
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+    inicio = time.perf_counter()
+    if compacto:
+        df = carregar_compacto(nome, dados)
+    else:
+        df = limpar_base(ler_arquivo(nome, dados))
+    # Tempo da conversão do arquivo original (feita uma única vez), guardado junto do Parquet
+    # para ser exibido na interface. Planilhas Excel informam também o leitor usado.
+    df.attrs["conversao"] = {
+        "formato": "csv" if nome.endswith(".csv") else "xlsx",
+        "motor": "pandas" if nome.endswith(".csv") else MOTOR_EXCEL,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        # Escreve em arquivo temporário e renomeia, para que leituras concorrentes
+        # nunca encontrem um Parquet pela metade.
+        temporario = f"{caminho}.{os.getpid()}.{time.time_ns()}.tmp"
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+        _remover_excedentes()
+    except Exception:
+        # Colunas com tipos mistos (comuns em XLSX) podem não ser serializáveis em Parquet;
+        # nesse caso a base segue sem cache, exatamente como antes.
+        if "temporario" in locals() and os.path.exists(temporario):
+            os.remove(temporario)
+
+    return df
+
+
+def carregar_arquivo(caminho, compacto=True):
+    """Versão de `carregar_base` para arquivos em disco (scripts e linha de comando)."""
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    return carregar_base(os.path.basename(caminho), dados, compacto=compacto)
+
+
+def salvar_tabela(df, caminho):
+    """Salva uma tabela de resultados em Parquet (extensão .parquet) ou CSV."""
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    if caminho.endswith(".parquet"):
+        df.to_parquet(caminho, index=False)
+    else:
+        df.to_csv(caminho, index=False)
+
+
+def ler_tabela(nome, dados):
+    """Lê uma tabela de resultados salva por `salvar_tabela` a partir dos bytes do arquivo."""
+    if nome.endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(dados))
+    return pd.read_csv(io.BytesIO(dados))
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# -------------------------------
+# Instrumentação por Etapa (tempo, memória e tamanho dos dados)
+# -------------------------------
+# Cada etapa medida registra o tempo de execução, a variação de memória (RSS atual e pico
+# do processo) e o tamanho da tabela produzida. As medições vão para o painel de diagnóstico
+# da barra lateral e para o log em formato JSON (uma linha por etapa), que pode ser agregado
+# entre sessões em produção.
+
+logger = logging.getLogger("proscout.metricas")
+
+
+def configurar_log():
+    """Envia as medições para a saída de erro como linhas JSON (chamada idempotente)."""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def memoria_rss_mb():
+    """Memória residente atual do processo, em MB (None se indisponível)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def pico_rss_mb():
+    """Maior memória residente já atingida pelo processo, em MB (None se indisponível)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS.
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+class Medicao(dict):
+    """Registro de uma etapa; `tamanho(df)` anota linhas e colunas do resultado."""
+
+    def tamanho(self, df):
+        self["linhas"], self["colunas"] = df.shape
+        return df
+
+
+def _delta(fim, inicio):
+    return None if fim is None or inicio is None else round(fim - inicio, 2)
+
+
+@contextmanager
+def medir(nome, registros=None, **contexto):
+    """
+    Mede o bloco como a etapa `nome`.
+
+    A medição é adicionada a `registros` (se informado) e emitida no log; `contexto` entra
+    no registro (ex: identificador da sessão).
+    """
+    medicao = Medicao(etapa=nome, **contexto)
+    rss_inicio, pico_inicio = memoria_rss_mb(), pico_rss_mb()
+    inicio = time.perf_counter()
+    try:
+        yield medicao
+    finally:
+        medicao["segundos"] = round(time.perf_counter() - inicio, 4)
+        medicao["rss_delta_mb"] = _delta(memoria_rss_mb(), rss_inicio)
+        medicao["pico_rss_delta_mb"] = _delta(pico_rss_mb(), pico_inicio)
+        if registros is not None:
+            registros.append(medicao)
+        logger.info(json.dumps(medicao, ensure_ascii=False, default=str))
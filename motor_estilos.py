@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from config_estilos import metricas_por_estilo, pesos_por_estilo, metricas_negativas
+from filtros import recortar
+
+# -------------------------------
+# Motor de Score por Estilo (independente da interface)
+# -------------------------------
+# Os dicionários de configuração são compilados uma única vez em uma matriz densa de pesos
+# (estilos x métricas). A base filtrada vira uma matriz de percentis em uma única passada e o
+# score de todos os estilos, para todos os jogadores, sai de um produto de matrizes. O mesmo
+# motor é usado pela página "Análise de Estilos", por scripts e pela linha de comando.
+
+
+def calcular_percentis(df, metricas, negativas=metricas_negativas, linhas=None):
+    """
+    Retorna os percentis (0 a 100) das métricas existentes em `df`, uma coluna por métrica.
+
+    Equivale a `df[col].rank(pct=True) * 100` coluna a coluna (empates pela média, nulos
+    preservados), com o ranqueamento invertido para as métricas em `negativas`. Com
+    `linhas` (posições vindas dos filtros), só essas linhas entram no ranqueamento.
+    """
+    metricas = [m for m in dict.fromkeys(metricas) if m in df.columns]
+    tabela = recortar(df, linhas, metricas)
+    if not all(pd.api.types.is_numeric_dtype(tipo) for tipo in tabela.dtypes):
+        tabela = tabela.apply(pd.to_numeric, errors="coerce")
+    valores = tabela.to_numpy(dtype="float64", na_value=np.nan)
+
+    # Inverter o sinal equivale a ranquear em ordem decrescente (ex: menos Gols Sofridos =
+    # percentil mais alto), permitindo ranquear todas as colunas em uma única chamada.
+    sinais = np.where(np.isin(metricas, list(negativas)), -1.0, 1.0)
+    percentis = pd.DataFrame(valores * sinais, index=tabela.index, columns=metricas).rank(pct=True) * 100
+    return percentis
+
+
+def posicoes_melhores(scores, n):
+    """
+    Posições dos `n` maiores scores, em ordem decrescente (nulos por último).
+
+    Mesma ordem de `sort_values(ascending=False, kind="stable").head(n)`, mas com seleção
+    parcial (argpartition): só os `n` escolhidos são ordenados, então o custo cresce com o
+    tamanho da base apenas de forma linear. Empates seguem a ordem original das linhas.
+    """
+    valores = np.asarray(scores, dtype=np.float64)
+    validos = np.flatnonzero(~np.isnan(valores))
+    n = max(0, min(int(n), len(valores)))
+    if n >= len(validos):
+        ordenados = validos[np.argsort(-valores[validos], kind="stable")]
+        return np.concatenate([ordenados, np.flatnonzero(np.isnan(valores))[: n - len(validos)]])
+    if n == 0:
+        return validos[:0]
+
+    negativos = -valores[validos]
+    # Valor do n-ésimo colocado: entram todos os melhores que ele e, dos empatados com ele,
+    # os primeiros na ordem das linhas.
+    limiar = np.partition(negativos, n - 1)[n - 1]
+    melhores = np.flatnonzero(negativos < limiar)
+    empatados = np.flatnonzero(negativos == limiar)[: n - len(melhores)]
+    escolhidos = np.sort(np.concatenate([melhores, empatados]))
+    return validos[escolhidos[np.argsort(negativos[escolhidos], kind="stable")]]
+
+
+class MotorEstilos:
+    """Matriz de pesos compilada a partir de `metricas_por_estilo` e `pesos_por_estilo`."""
+
+    def __init__(self, metricas_por_estilo, pesos_por_estilo):
+        self.estilos = list(metricas_por_estilo)
+        self.metricas = list(dict.fromkeys(m for metricas in metricas_por_estilo.values() for m in metricas))
+        posicao = {m: j for j, m in enumerate(self.metricas)}
+
+        # pesos[s, j]: peso da métrica j no estilo s (0 quando não há peso definido).
+        # membros[s, j]: a métrica j faz parte do estilo s (usado na média simples).
+        self.pesos = np.zeros((len(self.estilos), len(self.metricas)))
+        self.membros = np.zeros((len(self.estilos), len(self.metricas)), dtype=bool)
+        for s, estilo in enumerate(self.estilos):
+            pesos_estilo = pesos_por_estilo.get(estilo, {})
+            for metrica in metricas_por_estilo[estilo]:
+                self.membros[s, posicao[metrica]] = True
+                self.pesos[s, posicao[metrica]] = pesos_estilo.get(metrica, 0.0)
+        self.pesos.flags.writeable = False
+        self.membros.flags.writeable = False
+        self._indice_estilo = {e: s for s, e in enumerate(self.estilos)}
+
+    def metricas_dos_estilos(self, estilos, colunas=None):
+        """Métricas usadas pelos estilos (sem repetição), opcionalmente só as presentes em `colunas`."""
+        linhas = [self._indice_estilo[e] for e in estilos if e in self._indice_estilo]
+        usadas = self.membros[linhas].any(axis=0) if linhas else np.zeros(len(self.metricas), dtype=bool)
+        return [m for m, usada in zip(self.metricas, usadas) if usada and (colunas is None or m in colunas)]
+
+    def percentis(self, df, estilos=None, linhas=None):
+        """Percentis das métricas do motor (ou só das métricas de `estilos`) presentes em `df`."""
+        metricas = self.metricas if estilos is None else self.metricas_dos_estilos(estilos)
+        return calcular_percentis(df, metricas, linhas=linhas)
+
+    def _pontuar(self, percentis, pesos, membros):
+        # Alinha os percentis às colunas do motor; métricas ausentes na base não contam.
+        existentes = np.isin(self.metricas, list(percentis.columns))
+        matriz = percentis.reindex(columns=self.metricas).to_numpy(dtype="float64", na_value=np.nan)
+        pesos = pesos * existentes
+        membros = membros & existentes
+
+        # Estilos com pesos usam a média ponderada; sem pesos, a média simples das métricas.
+        soma_pesos = pesos.sum(axis=1)
+        ponderado = soma_pesos > 0
+        coeficientes = np.where(ponderado[:, None], pesos, membros.astype("float64"))
+        usadas = (coeficientes > 0).astype("float64")
+
+        nulos = np.isnan(matriz)
+        soma = np.where(nulos, 0.0, matriz) @ coeficientes.T
+        qtd_nulos = nulos.astype("float64") @ usadas.T
+        qtd_validos = (~nulos).astype("float64") @ usadas.T
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = soma / np.where(ponderado, soma_pesos, qtd_validos)
+        # Na média ponderada um percentil nulo anula o score (como na soma do pandas); na
+        # média simples os nulos são ignorados.
+        scores[(qtd_nulos > 0) & ponderado] = np.nan
+        scores[qtd_validos == 0] = np.nan
+        return scores
+
+    def pontuar_todos(self, percentis):
+        """Score (0 a 100) de todos os estilos para todos os jogadores, um estilo por coluna."""
+        scores = self._pontuar(percentis, self.pesos, self.membros)
+        return pd.DataFrame(scores, index=percentis.index, columns=self.estilos)
+
+    def pontuar(self, percentis, estilos):
+        """
+        Score combinado de uma seleção de estilos.
+
+        Cada métrica recebe o maior peso entre os estilos escolhidos; se nenhuma métrica
+        existente tiver peso, o score é a média simples dos percentis.
+        """
+        linhas = [self._indice_estilo[e] for e in estilos if e in self._indice_estilo]
+        pesos = self.pesos[linhas].max(axis=0, initial=0.0)[None, :]
+        membros = self.membros[linhas].any(axis=0)[None, :]
+        scores = self._pontuar(percentis, pesos, membros)
+        return pd.Series(scores[:, 0], index=percentis.index, name="Score")
+
+
+# Motor compilado uma única vez a partir da configuração padrão.
+motor_padrao = MotorEstilos(metricas_por_estilo, pesos_por_estilo)
@@ -0,0 +1,178 @@
+import io
+import os
+import threading
+import urllib.request
+from functools import lru_cache
+
+from config_estilos import kpis_por_posicao, grupo_cores
+
+# -------------------------------
+# Gráfico de Radar (Pizza Plot)
+# -------------------------------
+# As fontes Roboto (Roboto-Regular.ttf e RobotoSlab[wght].ttf, licença Apache) são lidas da
+# pasta `DIRETORIO_FONTES` e carregadas uma única vez por processo. Os .ttf não são versionados:
+# se não estiverem na pasta, há uma única tentativa de download para ela (até 5 s por fonte) e,
+# sem rede, o radar usa a fonte padrão do matplotlib em vez de falhar. Em servidores sem acesso
+# à internet, copie os dois arquivos antes de subir a aplicação para a pasta `fonts/` do
+# repositório ou para a pasta indicada em `PROSCOUT_FONTS_DIR`; com `PROSCOUT_FONTS_OFFLINE=1`
+# o download nem é tentado. Os caminhos são resolvidos fora da trava do pyplot, para que uma
+# tentativa de download lenta não segure os radares das outras sessões, e são repassados aos
+# processos da exportação em lote, que não tentam o download de novo.
+
+DIRETORIO_FONTES = os.environ.get("PROSCOUT_FONTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"))
+
+FONTES = {
+    "normal": ("Roboto-Regular.ttf", "https://raw.githubusercontent.com/googlefonts/roboto/main/src/hinted/Roboto-Regular.ttf"),
+    "negrito": ("RobotoSlab[wght].ttf", "https://raw.githubusercontent.com/google/fonts/main/apache/robotoslab/RobotoSlab[wght].ttf"),
+}
+
+# Resolução da imagem do radar (a mesma usada pelo st.pyplot).
+DPI_RADAR = 200
+
+# O estado global do pyplot não é seguro entre threads (cada sessão do Streamlit roda em
+# uma thread), então a criação e a exportação das figuras são serializadas.
+_trava_pyplot = threading.Lock()
+
+# Caminhos das fontes (estilo -> arquivo, ou None se indisponível), resolvidos uma vez.
+_caminhos_fontes = None
+_trava_fontes = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _pyplot():
+    # O matplotlib (e o mplsoccer, que depende dele) só é importado quando o primeiro radar é
+    # desenhado: abrir a aplicação ou montar os dados do radar não paga esse custo.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _arquivo_fonte(nome_arquivo, url):
+    caminho = os.path.join(DIRETORIO_FONTES, nome_arquivo)
+    if os.path.exists(caminho):
+        return caminho
+    if os.environ.get("PROSCOUT_FONTS_OFFLINE"):
+        return None
+    try:
+        os.makedirs(DIRETORIO_FONTES, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with urllib.request.urlopen(url, timeout=5) as resposta, open(temporario, "wb") as arquivo:
+            arquivo.write(resposta.read())
+        os.replace(temporario, caminho)
+        return caminho
+    except Exception:
+        return None
+
+
+def caminhos_fontes():
+    """Arquivo de cada fonte (ou None se indisponível), resolvido uma única vez por processo."""
+    global _caminhos_fontes
+    with _trava_fontes:
+        if _caminhos_fontes is None:
+            _caminhos_fontes = {estilo: _arquivo_fonte(nome_arquivo, url) for estilo, (nome_arquivo, url) in FONTES.items()}
+        return dict(_caminhos_fontes)
+
+
+def usar_caminhos_fontes(caminhos):
+    """Define os caminhos já resolvidos (usado pelos processos da exportação em lote)."""
+    global _caminhos_fontes
+    with _trava_fontes:
+        _caminhos_fontes = dict(caminhos)
+
+
+@lru_cache(maxsize=None)
+def carregar_fontes():
+    """Retorna as fontes (normal, negrito) do radar, resolvidas uma única vez por processo."""
+    from matplotlib.font_manager import FontProperties
+
+    fontes = {}
+    for estilo, caminho in caminhos_fontes().items():
+        if caminho is not None:
+            fontes[estilo] = FontProperties(fname=caminho)
+        else:
+            fontes[estilo] = FontProperties(weight="bold" if estilo == "negrito" else "normal")
+    return fontes["normal"], fontes["negrito"]
+
+
+def montar_radar(linha, posicao):
+    """
+    Prepara as métricas, os valores (percentis) e as cores do radar de um jogador.
+
+    `linha` é a linha do jogador com as colunas de percentil ("<métrica>_pct"); as métricas
+    seguem os grupos de `kpis_por_posicao` da posição escolhida.
+    """
+    metricas_ordenadas = []
+    valores = []
+    slice_colors = []
+    for grupo, metricas in kpis_por_posicao.get(posicao, {}).items():
+        for metrica in metricas:
+            pct_col = metrica + "_pct"
+            if pct_col in linha.index:
+                metricas_ordenadas.append(metrica)
+                valores.append(round(float(linha[pct_col]), 2))
+                slice_colors.append(grupo_cores.get(grupo, "#999999"))
+    return metricas_ordenadas, valores, slice_colors
+
+
+def _baker(params):
+    # Um PyPizza novo por render: ele guarda os textos (e, com eles, a figura) do último
+    # gráfico desenhado, então reaproveitá-lo manteria vivas figuras já fechadas.
+    _pyplot()
+    from mplsoccer import PyPizza
+
+    return PyPizza(
+        params=list(params),
+        background_color="#ffffff",
+        straight_line_color="#cccccc",
+        straight_line_lw=1,
+        last_circle_lw=0,
+        other_circle_lw=0,
+        inner_circle_size=20
+    )
+
+
+def _desenhar(params, valores, slice_colors, titulo, fontes):
+    font_normal, font_bold = fontes
+    fig, ax = _baker(tuple(params)).make_pizza(
+        list(valores),
+        figsize=(6, 6),
+        color_blank_space="same",
+        slice_colors=list(slice_colors),
+        value_colors=["#000000"] * len(valores),
+        kwargs_slices=dict(edgecolor="#ffffff", zorder=2, linewidth=1),
+        kwargs_params=dict(color="#000000", fontsize=4, fontproperties=font_normal, va="center"),
+        kwargs_values=dict(color="#000000", fontsize=8, fontproperties=font_bold, zorder=3, va="center")
+    )
+    fig.text(0.5, 0.97, titulo, size=12, ha="center", fontproperties=font_bold, color="#000000")
+    return fig
+
+
+def renderizar_radar(params, valores, slice_colors, titulo, formato="png"):
+    """
+    Desenha o radar e retorna a imagem em bytes (PNG ou PDF).
+
+    A figura é sempre fechada após a exportação, para que servidores de longa duração não
+    acumulem figuras do matplotlib na memória.
+    """
+    plt = _pyplot()
+    # Fora da trava: a primeira resolução das fontes pode tentar um download.
+    fontes = carregar_fontes()
+    with _trava_pyplot:
+        fig = _desenhar(params, valores, slice_colors, titulo, fontes)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=formato, dpi=DPI_RADAR, bbox_inches="tight")
+            return buffer.getvalue()
+        finally:
+            plt.close(fig)
+
+
+@lru_cache(maxsize=128)
+def _radar_png_cache(params, valores, slice_colors, titulo):
+    return renderizar_radar(params, valores, slice_colors, titulo)
+
+
+def radar_png(params, valores, slice_colors, titulo):
+    """PNG do radar, reaproveitado quando o mesmo radar é pedido novamente (ex: reruns)."""
+    return _radar_png_cache(tuple(params), tuple(valores), tuple(slice_colors), titulo)
@@ -0,0 +1,122 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import ingestao
+from config_estilos import posicoes_fixas, estilos_pos
+from filtros import filtrar_idade_minutos
+from motor_estilos import calcular_percentis, motor_padrao, posicoes_melhores
+from similaridade import tipo_do_jogador
+
+# -------------------------------
+# Rankings em Lote: Todas as Posições x Todos os Estilos
+# -------------------------------
+# Versão sem interface do botão "Gerar análise": para cada base (ou para as bases unidas),
+# calcula os percentis e o score de todos os estilos de uma vez e monta o ranking de cada
+# estilo das posições de `posicoes_fixas`. Como na busca de similares, goleiros e jogadores de
+# linha são pools separados (`tipo_do_jogador`): os estilos de goleiro ranqueiam só goleiros, e
+# os de linha só jogadores de linha. Um estilo usado em várias posições de linha (ex:
+# Construtor) sai uma única vez, com as posições listadas na coluna "Posições". Cada arquivo de entrada é uma tarefa completa
+# (leitura, filtros, percentis, scores e rankings) em um pool de processos; só o nome do
+# arquivo vai para o processo e só o caminho da saída volta.
+# Exemplo:
+#   python ranking_lote.py brasileirao.csv argentina.xlsx --minutos 500 99999 --saida rankings/
+
+COLUNAS_RANKING = ["Jogador", "Equipa", "Posição", "Idade", "Minutos jogados:"]
+
+
+def estilos_por_segmento():
+    """Estilos de cada segmento (Goleiro ou Linha), com as posições em que cada estilo aparece."""
+    segmentos = {}
+    for posicao in posicoes_fixas:
+        estilos = segmentos.setdefault(tipo_do_jogador(posicao), {})
+        for estilo in estilos_pos.get(posicao, []):
+            estilos.setdefault(estilo, []).append(posicao)
+    return segmentos
+
+
+def ranking_segmento(segmento, estilos, tabela, top=None):
+    """
+    Ranking de cada estilo do segmento, em formato longo.
+
+    `estilos` mapeia cada estilo às posições em que ele aparece; `tabela` traz só os jogadores
+    do segmento, com as colunas de identificação e uma coluna de score por estilo.
+    """
+    colunas_id = [c for c in COLUNAS_RANKING if c in tabela.columns]
+    rankings = []
+    for estilo, posicoes in estilos.items():
+        if estilo not in tabela.columns:
+            continue
+        if top:
+            # Só os `top` primeiros são ordenados (seleção parcial).
+            ordenada = tabela.iloc[posicoes_melhores(tabela[estilo], top)]
+        else:
+            ordenada = tabela.sort_values(by=estilo, ascending=False, na_position="last", kind="stable")
+        ranking = ordenada[colunas_id].copy()
+        ranking.insert(0, "Rank", range(1, len(ranking) + 1))
+        ranking.insert(0, "Posições", ", ".join(posicoes))
+        ranking.insert(0, "Estilo", estilo)
+        ranking.insert(0, "Segmento", segmento)
+        ranking["Score"] = ordenada[estilo].to_numpy()
+        rankings.append(ranking)
+    return pd.concat(rankings, ignore_index=True) if rankings else pd.DataFrame()
+
+
+def rankings_base(df, top=None):
+    """Rankings de todos os estilos, por segmento (Goleiro ou Linha), para uma base já filtrada."""
+    percentis = calcular_percentis(df, motor_padrao.metricas)
+    scores = motor_padrao.pontuar_todos(percentis)
+    identificacao = df[[c for c in COLUNAS_RANKING if c in df.columns]]
+    segmentos = df["Posição"].map(tipo_do_jogador).to_numpy()
+
+    rankings = []
+    for segmento, estilos in estilos_por_segmento().items():
+        tabela = identificacao.join(scores[list(estilos)])[segmentos == segmento]
+        rankings.append(ranking_segmento(segmento, estilos, tabela, top))
+    return pd.concat(rankings, ignore_index=True)
+
+
+def processar_base(nome, df, args):
+    """Filtra a base, gera os rankings e salva o arquivo de saída; retorna o resumo impresso."""
+    df = filtrar_idade_minutos(df, args.idade, args.minutos)
+    rankings = rankings_base(df, args.top)
+    caminho = os.path.join(args.saida, f"{nome}_rankings.{args.formato}")
+    ingestao.salvar_tabela(rankings, caminho)
+    return f"{nome}: {len(df)} jogadores, {len(rankings)} linhas salvas em {caminho}"
+
+
+def processar_arquivo(caminho, args):
+    """Tarefa de um processo: leitura e todo o cálculo de um arquivo de entrada."""
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    return processar_base(nome, ingestao.carregar_arquivo(caminho), args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os rankings de todos os estilos de todas as posições, sem a interface.")
+    parser.add_argument("arquivos", nargs="+", help="Exportações do Wyscout (CSV ou XLSX).")
+    parser.add_argument("--idade", nargs=2, type=float, default=(0, 100), metavar=("MIN", "MAX"), help="Faixa de idade.")
+    parser.add_argument("--minutos", nargs=2, type=float, default=(0, 99999), metavar=("MIN", "MAX"), help="Faixa de minutos jogados.")
+    parser.add_argument("--combinar", action="store_true", help="Une todas as bases em um único pool (padrão: um ranking por arquivo).")
+    parser.add_argument("--top", type=int, default=None, help="Mantém só os N primeiros de cada ranking.")
+    parser.add_argument("--jobs", type=int, default=None, help="Processos usados com vários arquivos (padrão: todos os núcleos).")
+    parser.add_argument("--formato", choices=["parquet", "csv"], default="parquet", help="Formato dos arquivos de saída.")
+    parser.add_argument("--saida", default="rankings", help="Pasta de saída.")
+    args = parser.parse_args(argv)
+
+    if args.combinar:
+        df = pd.concat([ingestao.carregar_arquivo(caminho) for caminho in args.arquivos], ignore_index=True)
+        print(processar_base("combinado", df, args))
+    elif len(args.arquivos) == 1 or args.jobs == 1:
+        # Um único arquivo não tem o que paralelizar: o pool só somaria o custo dos processos.
+        for caminho in args.arquivos:
+            print(processar_arquivo(caminho, args))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for resumo in executor.map(processar_arquivo, args.arquivos, [args] * len(args.arquivos)):
+                print(resumo)
+
+
+if __name__ == "__main__":
+    main()
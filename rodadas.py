@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from armazem import congelar_tabela
+
+# -------------------------------
+# Atualização por Rodada
+# -------------------------------
+# Depois de cada rodada chega um arquivo só com os jogadores que têm dados novos (chave:
+# 'Jogador' + 'Equipa'). Em vez de reenviar a temporada inteira (e refazer leitura e limpeza),
+# a rodada é aplicada sobre a versão anterior da base, que continua no armazém compartilhado.
+#
+# Percentis e scores não são mantidos rodada a rodada: a mudança de valor de um jogador move no
+# ranking todos os que estão entre o valor antigo e o novo, e uma rodada real altera jogadores
+# espalhados pela base inteira, então quase todas as linhas seriam recalculadas de qualquer
+# forma. Eles saem da versão atualizada, pelo mesmo caminho (e o mesmo cache) da base sem
+# rodadas, só quando a análise os pede e já com os filtros de idade e minutos aplicados.
+
+COLUNAS_CHAVE = ["Jogador", "Equipa"]
+
+
+def chaves_jogadores(df):
+    """Chave 'Jogador' + 'Equipa' de cada linha (como texto)."""
+    return pd.Index(df["Jogador"].astype(str).to_numpy(dtype=object) + "\x00" + df["Equipa"].astype(str).to_numpy(dtype=object))
+
+
+class BaseIncremental:
+    """
+    Base da temporada com as rodadas já aplicadas.
+
+    Cada versão é imutável: `aplicar_rodada` devolve uma nova versão, e a anterior pode
+    continuar sendo usada por outras sessões.
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True) if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 else df
+        self.linhas_atualizadas = 0
+
+        chaves = chaves_jogadores(self.df)
+        # Com nomes repetidos na mesma equipe, a rodada atualiza a primeira ocorrência.
+        self._chaves = chaves[~chaves.duplicated()]
+        self._linhas_chaves = np.flatnonzero(~chaves.duplicated())
+
+    @property
+    def nbytes(self):
+        """Memória aproximada da versão (base e índice das chaves)."""
+        tabela = int(self.df.memory_usage(index=True, deep=False).sum())
+        return tabela + self._chaves.memory_usage() + self._linhas_chaves.nbytes
+
+    def aplicar_rodada(self, delta):
+        """
+        Nova versão da base com os dados de `delta` (uma linha por jogador com dados novos).
+
+        Jogadores já existentes têm as colunas presentes em `delta` substituídas; jogadores
+        novos entram no fim da base. Colunas de `delta` que a base não tem são ignoradas.
+        """
+        delta = delta.drop_duplicates(subset=COLUNAS_CHAVE, keep="last").reset_index(drop=True)
+        delta.attrs = {}
+        encontradas = self._chaves.get_indexer(chaves_jogadores(delta))
+        existentes = encontradas >= 0
+        linhas_existentes = self._linhas_chaves[encontradas[existentes]]
+        novos = delta[~existentes]
+        colunas = [c for c in delta.columns if c in self.df.columns and c not in COLUNAS_CHAVE]
+
+        nova = object.__new__(BaseIncremental)
+        nova.df = self._base_atualizada(delta[existentes], linhas_existentes, novos, colunas)
+
+        chaves_novas = chaves_jogadores(novos)
+        primeiras = ~chaves_novas.duplicated()
+        nova._chaves = self._chaves.append(chaves_novas[primeiras])
+        nova._linhas_chaves = np.concatenate([self._linhas_chaves, len(self.df) + np.flatnonzero(primeiras)])
+        nova.linhas_atualizadas = int(existentes.sum()) + len(novos)
+        return nova
+
+    def _base_atualizada(self, atualizacoes, linhas, novos, colunas):
+        # A base anterior é compartilhada e somente leitura: a nova versão é uma cópia.
+        df = self.df.copy()
+        # Sem `attrs` durante a atualização: o pandas copiaria os atributos a cada coluna acessada.
+        df.attrs = {}
+        for col in colunas:
+            valores = atualizacoes[col]
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                faltantes = pd.Index(valores.dropna().unique()).difference(df[col].cat.categories)
+                if len(faltantes):
+                    df[col] = df[col].cat.add_categories(faltantes)
+            df.iloc[linhas, df.columns.get_loc(col)] = valores.to_numpy()
+        if len(novos):
+            tipos = df.dtypes
+            df = pd.concat([df, novos.reindex(columns=df.columns)], ignore_index=True)
+            # A concatenação promove float32 e categorias para tipos mais largos; volta aos originais.
+            for col, tipo in tipos.items():
+                if isinstance(tipo, pd.CategoricalDtype):
+                    df[col] = df[col].astype("object").astype("category")
+                elif tipo.kind == "f" and df[col].dtype != tipo:
+                    df[col] = df[col].astype(tipo)
+        df.attrs = dict(self.df.attrs)
+        return congelar_tabela(df)
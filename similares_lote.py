@@ -0,0 +1,35 @@
+import argparse
+
+import pandas as pd
+
+import ingestao
+from filtros import filtrar_idade_minutos
+from similaridade import preparar_base_similaridade, similares_todos
+
+# -------------------------------
+# Relatório em Lote: Jogadores Mais Similares a Todos os Jogadores
+# -------------------------------
+# Exemplo:
+#   python similares_lote.py brasileirao.csv --k 10 --minutos 500 99999 --saida similares.parquet
+# O arquivo gerado pode ser carregado na página "Jogador Similar" para consulta imediata.
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula os k jogadores mais similares a cada jogador da base.")
+    parser.add_argument("arquivos", nargs="+", help="Exportações do Wyscout (CSV ou XLSX); várias bases são unidas em um único pool.")
+    parser.add_argument("--k", type=int, default=10, help="Quantidade de vizinhos por jogador (padrão: 10).")
+    parser.add_argument("--idade", nargs=2, type=float, default=(0, 100), metavar=("MIN", "MAX"), help="Faixa de idade.")
+    parser.add_argument("--minutos", nargs=2, type=float, default=(0, 99999), metavar=("MIN", "MAX"), help="Faixa de minutos jogados.")
+    parser.add_argument("--jobs", type=int, default=None, help="Threads usadas no cálculo (padrão: todos os núcleos).")
+    parser.add_argument("--saida", default="similares.parquet", help="Arquivo de saída (.parquet ou .csv).")
+    args = parser.parse_args(argv)
+
+    df = pd.concat([ingestao.carregar_arquivo(caminho) for caminho in args.arquivos], ignore_index=True)
+    df = filtrar_idade_minutos(df, args.idade, args.minutos)
+    relatorio = similares_todos(preparar_base_similaridade(df), k=args.k, n_jobs=args.jobs)
+    ingestao.salvar_tabela(relatorio, args.saida)
+    print(f"{relatorio['Chave_Unica'].nunique()} jogadores, {len(relatorio)} linhas salvas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config_estilos import kpis_por_posicao
+from filtros import recortar
+
+# -------------------------------
+# Índice de Similaridade (Top-k por Cosseno)
+# -------------------------------
+# Em vez de reajustar o StandardScaler e recalcular o cosseno contra todo o pool a cada
+# busca, o índice guarda os vetores já padronizados (média 0, desvio padrão 1) e
+# normalizados (norma L2 = 1) em uma matriz contígua float32. Assim, a similaridade do
+# cosseno vira um produto escalar e o top-k sai de uma seleção parcial (argpartition),
+# sem ordenar o pool inteiro. Buscas com várias referências usam um único produto de matrizes
+# para todas elas, com as restrições de idade/minutos/posição aplicadas como máscaras.
+
+
+# Memória máxima (em MB) de cada bloco da matriz de similaridade no modo em lote.
+MEMORIA_BLOCO_MB = 64
+
+
+# Colunas de identificação mantidas na base da busca (exibidas na tabela de resultados).
+COLUNAS_SIMILARIDADE = ["Jogador", "Equipa", "Posição", "Idade", "Minutos jogados:"]
+
+# Colunas guardadas no índice para restringir os candidatos das buscas (máscaras vetorizadas).
+COLUNAS_RESTRICAO = ["Idade", "Minutos jogados:", "Posição"]
+
+# Formas de combinar várias referências em uma única lista (ver `consultar_varios`).
+AGREGACOES = ["max", "media", "centroide"]
+
+
+def preparar_base_similaridade(df, linhas=None):
+    """
+    Cria a chave única "Jogador (Equipa)" e mantém uma única linha por jogador/equipe.
+
+    Copia apenas as `linhas` informadas (posições vindas dos filtros) e só as colunas usadas
+    pela busca: identificação e métricas de Goleiros e de Linha. Requer 'Jogador' e 'Equipa'.
+    """
+    colunas = COLUNAS_SIMILARIDADE + metricas_similaridade("Goleiro", df.columns) + metricas_similaridade("Linha", df.columns)
+    df_calculo = recortar(df, linhas, colunas)
+    df_calculo["Chave_Unica"] = df_calculo["Jogador"].astype(str) + " (" + df_calculo["Equipa"].astype(str) + ")"
+    return df_calculo.drop_duplicates(subset=["Chave_Unica"], keep="first")
+
+
+def tipo_do_jogador(posicao):
+    """A similaridade é comparada apenas entre Goleiros OU Jogadores de Linha."""
+    return "Goleiro" if posicao == "Goleiro" else "Linha"
+
+
+def metricas_similaridade(tipo, colunas):
+    """Métricas de comparação do segmento (Goleiro ou Linha) presentes em `colunas`."""
+    if tipo == "Goleiro":
+        # Usa as métricas de defesa e posse de bola do goleiro.
+        metricas = kpis_por_posicao.get("Goleiro", {}).get("Defendendo", []) + \
+                   kpis_por_posicao.get("Goleiro", {}).get("Posse", [])
+    else:
+        # Combina métricas de TODAS as posições de linha para uma busca universal.
+        metricas = []
+        for pos, kpis in kpis_por_posicao.items():
+            if pos != "Goleiro":
+                for grupo_metrica in kpis.values():
+                    metricas.extend(grupo_metrica)
+    return [m for m in dict.fromkeys(metricas) if m in colunas]
+
+
+def selecionar_top_k(scores, k):
+    """Posições dos k maiores valores de `scores`, do maior para o menor (seleção parcial)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidatos = np.argpartition(-scores, k - 1)[:k]
+    return candidatos[np.argsort(-scores[candidatos], kind="stable")]
+
+
+def selecionar_top_k_linhas(scores, k):
+    """Versão de `selecionar_top_k` para cada linha de uma matriz: posições e valores, do maior para o menor."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((len(scores), 0), dtype=np.intp), np.empty((len(scores), 0), dtype=scores.dtype)
+    candidatos = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    valores = np.take_along_axis(scores, candidatos, axis=1)
+    ordem = np.argsort(-valores, axis=1, kind="stable")
+    return np.take_along_axis(candidatos, ordem, axis=1), np.take_along_axis(valores, ordem, axis=1)
+
+
+def vetores_normalizados(valores, padronizar=True):
+    """Padroniza as colunas (opcional) e normaliza cada linha para norma L2 = 1, em float32."""
+    valores = np.asarray(valores, dtype=np.float64)
+    if padronizar:
+        # Mesmo critério do StandardScaler: desvio padrão populacional, e colunas constantes
+        # não são escaladas.
+        desvio = valores.std(axis=0)
+        desvio[desvio == 0] = 1.0
+        valores = (valores - valores.mean(axis=0)) / desvio
+    normas = np.linalg.norm(valores, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return np.ascontiguousarray(valores / normas, dtype=np.float32)
+
+
+class IndiceSimilaridade:
+    """Vetores padronizados e normalizados de um segmento (Goleiro ou Linha) da base filtrada."""
+
+    def __init__(self, chaves, vetores, metricas, tipo, padronizado, atributos=None):
+        self.chaves = np.asarray(chaves, dtype=object)
+        self.vetores = vetores
+        self.vetores.flags.writeable = False
+        self.metricas = metricas
+        self.tipo = tipo
+        self.padronizado = padronizado
+        # Idade, minutos e posição de cada jogador, alinhados às chaves (restrições das buscas).
+        self.atributos = atributos or {}
+        for valores in self.atributos.values():
+            valores.flags.writeable = False
+        self._posicoes = {chave: i for i, chave in enumerate(self.chaves)}
+
+    @classmethod
+    def construir(cls, df_calculo, tipo, metricas=None):
+        """
+        Monta o índice a partir da base com a coluna 'Chave_Unica' (uma linha por jogador).
+
+        Pools muito pequenos (até 2 jogadores) não são padronizados, como na busca original.
+        """
+        if metricas is None:
+            metricas = metricas_similaridade(tipo, df_calculo.columns)
+        if tipo == "Goleiro":
+            segmento = df_calculo[df_calculo["Posição"] == "Goleiro"]
+        else:
+            segmento = df_calculo[df_calculo["Posição"] != "Goleiro"]
+
+        valores = segmento[metricas].fillna(0).to_numpy(dtype=np.float64)
+        padronizado = len(segmento) > 2
+        vetores = vetores_normalizados(valores, padronizado)
+        atributos = {}
+        for col in COLUNAS_RESTRICAO:
+            if col == "Posição" and col in segmento.columns:
+                atributos[col] = segmento[col].astype(str).to_numpy(dtype=object)
+            elif col in segmento.columns and pd.api.types.is_numeric_dtype(segmento[col]):
+                atributos[col] = segmento[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(segmento["Chave_Unica"].to_numpy(), vetores, metricas, tipo, padronizado, atributos)
+
+    def __len__(self):
+        return len(self.chaves)
+
+    @property
+    def nbytes(self):
+        """Memória aproximada do índice (vetores e chaves), usada pelo armazém compartilhado."""
+        tamanho = self.vetores.nbytes + sum(sys.getsizeof(chave) for chave in self.chaves)
+        return tamanho + sum(valores.nbytes for valores in self.atributos.values())
+
+    def __contains__(self, chave):
+        return chave in self._posicoes
+
+    def consultar(self, chave, k=5):
+        """
+        Retorna os k jogadores mais similares a `chave` (excluindo o próprio jogador).
+
+        O resultado é um DataFrame indexado por 'Chave_Unica' com a coluna 'Similaridade'
+        em porcentagem (0% a 100%), do mais similar para o menos similar.
+        """
+        i = self._posicoes[chave]
+        scores = self.vetores @ self.vetores[i]
+        # Remove o próprio jogador de referência do resultado.
+        scores[i] = -np.inf
+        top = selecionar_top_k(scores, min(k, len(self) - 1))
+        # Converte o valor do cosseno (0 a 1) para porcentagem, limitado por segurança.
+        similaridade = np.clip(scores[top].astype(np.float64) * 100, 0, 100)
+        return pd.DataFrame({"Similaridade": similaridade}, index=pd.Index(self.chaves[top], name="Chave_Unica"))
+
+    def mascara(self, faixas=None, posicoes=None):
+        """
+        Candidatos que atendem às restrições, como máscara booleana alinhada às chaves.
+
+        `faixas` mapeia coluna -> (mínimo, máximo), ambos inclusivos (valores nulos ficam de
+        fora); `posicoes` limita os candidatos a essas posições. Restrições sobre colunas que
+        o índice não tem não filtram.
+        """
+        mascara = np.ones(len(self), dtype=bool)
+        for col, (minimo, maximo) in (faixas or {}).items():
+            if col in self.atributos and col != "Posição":
+                valores = self.atributos[col]
+                mascara &= (valores >= minimo) & (valores <= maximo)
+        if posicoes and "Posição" in self.atributos:
+            mascara &= np.isin(self.atributos["Posição"], list(posicoes))
+        return mascara
+
+    def consultar_varios(self, chaves, k=5, mascara=None, agregacao="max"):
+        """
+        Os k mais similares a cada jogador de `chaves` e ao grupo todo, em uma única consulta.
+
+        Todas as referências são comparadas com o pool em um único produto de matrizes, então
+        10 referências custam quase o mesmo que uma. A `mascara` (ver `mascara`) restringe os
+        candidatos antes da seleção, e as próprias referências nunca entram nos resultados.
+        O grupo é combinado por `agregacao`: "max" (parecido com qualquer uma das referências),
+        "media" (parecido com todas) ou "centroide" (similaridade com o vetor médio do grupo).
+
+        Retorna (por_referencia, grupo): o primeiro em formato longo, com as colunas
+        'Referência', 'Rank', 'Chave_Unica' e 'Similaridade'; o segundo indexado por
+        'Chave_Unica', com 'Similaridade' e a 'Referência mais próxima' de cada candidato.
+        Similaridades em porcentagem (0% a 100%), do mais similar para o menos similar.
+        """
+        if agregacao not in AGREGACOES:
+            raise ValueError(f"Agregação desconhecida: {agregacao!r} (use uma de {AGREGACOES}).")
+        chaves = list(dict.fromkeys(chaves))
+        posicoes = np.array([self._posicoes[chave] for chave in chaves], dtype=np.intp)
+        referencias = self.vetores[posicoes]
+        if agregacao == "centroide":
+            centro = referencias.mean(axis=0, dtype=np.float64)
+            centro /= np.linalg.norm(centro) or 1.0
+            referencias = np.vstack([referencias, centro.astype(np.float32)])
+
+        scores = referencias @ self.vetores.T
+        candidatos = np.ones(len(self), dtype=bool) if mascara is None else np.array(mascara, dtype=bool)
+        candidatos[posicoes] = False
+        scores[:, ~candidatos] = -np.inf
+
+        if agregacao == "centroide":
+            grupo, scores = scores[-1], scores[:-1]
+        elif agregacao == "media":
+            grupo = scores.mean(axis=0)
+        else:
+            grupo = scores.max(axis=0)
+
+        # Uma única seleção parcial, linha a linha, para as listas de cada referência e do grupo.
+        k = max(0, min(k, int(candidatos.sum())))
+        vizinhos, valores = selecionar_top_k_linhas(np.vstack([scores, grupo]), k)
+        similaridades = np.clip(valores.astype(np.float64) * 100, 0, 100)
+
+        por_referencia = pd.DataFrame({
+            "Referência": np.repeat(np.asarray(chaves, dtype=object), k),
+            "Rank": np.tile(np.arange(1, k + 1), len(chaves)),
+            "Chave_Unica": self.chaves[vizinhos[:-1].ravel()],
+            "Similaridade": similaridades[:-1].ravel(),
+        })
+        mais_proxima = np.asarray(chaves, dtype=object)[scores[:, vizinhos[-1]].argmax(axis=0)] if k else []
+        grupo = pd.DataFrame(
+            {"Similaridade": similaridades[-1], "Referência mais próxima": mais_proxima},
+            index=pd.Index(self.chaves[vizinhos[-1]], name="Chave_Unica"),
+        )
+        return por_referencia, grupo
+
+    def top_k_todos(self, k=10, memoria_bloco_mb=MEMORIA_BLOCO_MB, n_jobs=None):
+        """
+        Calcula os k vizinhos mais similares de TODOS os jogadores do índice.
+
+        A matriz N x N nunca é materializada: as linhas são processadas em blocos de até
+        `memoria_bloco_mb` (cerca de 3x isso por thread, contando a seleção parcial)
+        distribuídos em threads, já que o produto de matrizes e a seleção parcial do NumPy
+        liberam o GIL.
+        Retorna duas matrizes N x k: posições dos vizinhos e similaridades (cosseno).
+        """
+        n = len(self)
+        k = max(0, min(k, n - 1))
+        vizinhos = np.empty((n, k), dtype=np.intp)
+        similaridades = np.empty((n, k), dtype=np.float32)
+        if k == 0:
+            return vizinhos, similaridades
+
+        tamanho_bloco = max(1, int(memoria_bloco_mb * 1024 * 1024 // (4 * n)))
+
+        def processar(inicio):
+            fim = min(inicio + tamanho_bloco, n)
+            # Similaridade com sinal invertido (no próprio bloco, sem cópia extra), para que a
+            # seleção parcial em ordem crescente traga os mais similares.
+            bloco = self.vetores[inicio:fim] @ self.vetores.T
+            np.negative(bloco, out=bloco)
+            # Remove o próprio jogador da lista de vizinhos.
+            bloco[np.arange(fim - inicio), np.arange(inicio, fim)] = np.inf
+            candidatos = np.argpartition(bloco, k - 1, axis=1)[:, :k]
+            valores = np.take_along_axis(bloco, candidatos, axis=1)
+            ordem = np.argsort(valores, axis=1, kind="stable")
+            vizinhos[inicio:fim] = np.take_along_axis(candidatos, ordem, axis=1)
+            similaridades[inicio:fim] = -np.take_along_axis(valores, ordem, axis=1)
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+            list(executor.map(processar, range(0, n, tamanho_bloco)))
+        return vizinhos, similaridades
+
+
+def similares_todos(df_calculo, k=10, n_jobs=None):
+    """
+    Relatório com os k jogadores mais similares a cada jogador da base, em formato longo.
+
+    Usa a mesma segmentação (Goleiro ou Linha) e as mesmas métricas da busca individual.
+    Colunas: 'Chave_Unica', 'Tipo', 'Rank', 'Similar' e 'Similaridade' (0% a 100%).
+    """
+    tabelas = []
+    for tipo in ["Goleiro", "Linha"]:
+        metricas = metricas_similaridade(tipo, df_calculo.columns)
+        if not metricas:
+            continue
+        indice = IndiceSimilaridade.construir(df_calculo, tipo, metricas)
+        vizinhos, similaridades = indice.top_k_todos(k, n_jobs=n_jobs)
+        if vizinhos.size == 0:
+            continue
+        qtd, k_real = vizinhos.shape
+        tabelas.append(pd.DataFrame({
+            "Chave_Unica": np.repeat(indice.chaves, k_real),
+            "Tipo": tipo,
+            "Rank": np.tile(np.arange(1, k_real + 1), qtd),
+            "Similar": indice.chaves[vizinhos.ravel()],
+            "Similaridade": np.clip(similaridades.ravel().astype(np.float64) * 100, 0, 100),
+        }))
+    if not tabelas:
+        return pd.DataFrame(columns=["Chave_Unica", "Tipo", "Rank", "Similar", "Similaridade"])
+    return pd.concat(tabelas, ignore_index=True)